@@ -1,8 +1,14 @@
-from fastapi import APIRouter, HTTPException, Query, Depends
+from fastapi import APIRouter, HTTPException, Query, Depends, Request
+from datetime import datetime
+from typing import Optional
+import polars as pl
 from services.assembly.assembly_api import AccessAssemblyLineApi
-from database.queries import UpsertInfos
+from services.assembly.differ import AssemblyDeltaSync, EVENTS
+from services.assembly.history import SnapshotHistory
+from orchestrator.compute import COMPUTE
 from helpers.services.assembly import BuildPipeline, DependeciesInjection
 from helpers.services.http_exception import HTTP_Exceptions
+from helpers.services.response import FrameJSONResponse
 
 
 router = APIRouter()
@@ -16,32 +22,73 @@ def get_raw_response(api: AccessAssemblyLineApi = Depends(DependeciesInjection.g
         raise HTTP_Exceptions().http_502("Erro ao buscar origem: ", e)
 
 
-@router.get("/response/processed")
+@router.get("/response/processed", response_class=FrameJSONResponse)
 def get_processed_response(
+    request: Request,
     api: AccessAssemblyLineApi = Depends(DependeciesInjection.get_api),
-    limit: int = Query(5000, ge=1, le=100000)
+    limit: int = Query(5000, ge=1, le=100000),
+    werk: Optional[str] = Query(None, description="Filtra por planta"),
+    orient: str = Query("rows", pattern="^(rows|columns)$", description="rows ou columns"),
 ):
     try:
-        df = BuildPipeline().build_assembly(api)
-        return df.head(limit).to_dicts()
+        # the HTTP fetch stays on the request thread, only the transform takes a compute slot
+        df = COMPUTE.run(BuildPipeline.transform_assembly, api.get_raw_response())
+        if werk:
+            df = df.filter(pl.col("werk") == werk)
+        return FrameJSONResponse.cached(df.head(limit), request, orient)
     except Exception as e:
         raise HTTP_Exceptions().http_500("Erro ao processar registros:", e)
 
 
+@router.get("/events")
+def get_events(
+    since: int = Query(0, ge=0),
+    werk: Optional[str] = Query(None, description="Filtra por planta"),
+):
+    try:
+        df = EVENTS.since(since)
+        if werk and len(df):
+            df = df.filter(pl.col("werk") == werk)
+        return df.to_dicts()
+    except Exception as e:
+        raise HTTP_Exceptions().http_500("Erro ao buscar eventos:", e)
+
+
+@router.get("/history", response_class=FrameJSONResponse)
+def get_history(
+    request: Request,
+    start: datetime,
+    end: datetime,
+    history: SnapshotHistory = Depends(DependeciesInjection.get_history),
+    werk: Optional[str] = Query(None, description="Filtra por planta"),
+    limit: int = Query(5000, ge=1, le=100000),
+    orient: str = Query("rows", pattern="^(rows|columns)$", description="rows ou columns"),
+):
+    try:
+        df = COMPUTE.run(lambda: history.scan(start, end, werk=werk).head(limit).collect())
+        return FrameJSONResponse.cached(df, request, orient)
+    except Exception as e:
+        raise HTTP_Exceptions().http_500("Erro ao buscar histórico:", e)
+
+
 @router.post("/upsert")
 def upsert_assembly(
     api: AccessAssemblyLineApi = Depends(DependeciesInjection.get_api),
-    upsert: UpsertInfos = Depends(DependeciesInjection.get_upsert),
-    batch_size: int = Query(10000, ge=1, le=100000)
+    delta_sync: AssemblyDeltaSync = Depends(DependeciesInjection.get_delta_sync),
+    history: SnapshotHistory = Depends(DependeciesInjection.get_history),
+    batch_size: Optional[int] = Query(None, ge=1, le=100000, description="Vazio usa o tamanho ajustado automaticamente"),
 ):
     try:
-        df = BuildPipeline().build_assembly(api)
-        rows = upsert.upsert_df("assembly_line", df, batch_size)
+        df = COMPUTE.run(BuildPipeline.transform_assembly, api.get_raw_response())
+        events = delta_sync.sync(df, batch_size)
+        # only snapshots that were synced are recorded, reads of the raw feed are not history
+        history.append(df)
 
         return {
             "message": "Upsert concluído com sucesso.",
-            "rows": rows,
-            "batch_size": batch_size,
+            "rows": len(df),
+            "events": events,
+            "batch_sizes": events["batch_sizes"],
             "table": "assembly_line",
         }
     except Exception as e:
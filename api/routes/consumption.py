@@ -1,4 +1,5 @@
 from fastapi import APIRouter, Query, Depends
+from typing import Optional
 from services.consumption.consumer import ConsumeValues
 from helpers.services.consumption import DependeciesInjection
 from helpers.services.http_exception import HTTP_Exceptions
@@ -8,16 +9,22 @@ router = APIRouter()
 
 
 @router.get("/response/to-consume")
-def get_to_consume_response(svc: ConsumeValues = Depends(DependeciesInjection.get_consume)):
+def get_to_consume_response(
+    svc: ConsumeValues = Depends(DependeciesInjection.get_consume),
+    werk: Optional[str] = Query(None, description="Filtra por planta"),
+):
     try:
-        return svc.get_raw_response()
+        return svc.get_raw_response(werk)
     except Exception as e:
         raise HTTP_Exceptions().http_502("Erro ao buscar origem: ", e)
 
 
 @router.put("/update/to-consume")
-def update_to_consume(svc: ConsumeValues = Depends(DependeciesInjection.get_consume)):
+def update_to_consume(
+    svc: ConsumeValues = Depends(DependeciesInjection.get_consume),
+    werk: Optional[str] = Query(None, description="Filtra por planta"),
+):
     try:
-        return svc._update_infos()
+        return svc._update_infos(werk=werk)
     except Exception as e:
         raise HTTP_Exceptions().http_502("Erro ao buscar origem: ", e)
\ No newline at end of file
@@ -1,66 +1,120 @@
-from fastapi import APIRouter, Query, Depends
-from database.queries import UpsertInfos
+from fastapi import APIRouter, Query, Depends, Request
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import copy_context
+from typing import List, Optional
+import polars as pl
+from database.connector import pool_workers
+from database.write_queue import WriteQueues
+from orchestrator.compute import COMPUTE
 
 from services.forecast.buff_al import ReturnBuffAssemblyLineValues
 from services.forecast.fx4pd import ReturnFX4PDValues
 from services.forecast.forecaster import DefineForecastValues
+from services.forecast.projection import ConsumptionProjection
 
 from helpers.services.forecast import BuildPipeline, DependenciesInjection
 from helpers.services.http_exception import HTTP_Exceptions
+from helpers.services.response import FrameJSONResponse
 
 
 router = APIRouter()
 
 
-@router.get("/response/buff_al")
+@router.get("/response/buff_al", response_class=FrameJSONResponse)
 def get_buff_al_response(
+    request: Request,
     svc: ReturnBuffAssemblyLineValues = Depends(DependenciesInjection.get_buff_al_service),
     limit: int = Query(5000, ge=1, le=100000, description="Limita a quantidade de registros retornados"),
+    offset: int = Query(0, ge=0),
+    werk: Optional[str] = Query(None, description="Filtra por planta"),
+    model: Optional[str] = Query(None, description="Filtra por modelo"),
+    columns: Optional[List[str]] = Query(None, description="Colunas retornadas"),
+    orient: str = Query("rows", pattern="^(rows|columns)$", description="rows ou columns"),
 ):
     try:
-        df = svc.return_values_from_db().collect()
-        return df.head(limit).to_dicts()
+        # the select runs on the request thread, the compute slot only covers the frame work
+        lf = svc.return_values_from_db(werk, columns=columns, model=model, limit=limit, offset=offset)
+        df = COMPUTE.run(lf.collect)
+        return FrameJSONResponse.cached(df, request, orient)
+    except ValueError as e:
+        raise HTTP_Exceptions().http_400("Parâmetro inválido", e)
     except Exception as e:
         raise HTTP_Exceptions().http_502("Erro ao buscar origem (buff_al): ", e)
 
 
-@router.get("/response/fx4pd")
+@router.get("/response/projection", response_class=FrameJSONResponse)
+def get_projection_response(
+    request: Request,
+    buff_svc: ReturnBuffAssemblyLineValues = Depends(DependenciesInjection.get_buff_al_service),
+    projection: ConsumptionProjection = Depends(DependenciesInjection.get_projection_service),
+    horizon: int = Query(60, ge=1, le=10000, description="Quantidade de takts projetados"),
+    cumulative_only: bool = Query(False, description="Retorna apenas o total por peça no horizonte"),
+    werk: Optional[str] = Query(None, description="Filtra por planta"),
+    orient: str = Query("rows", pattern="^(rows|columns)$", description="rows ou columns"),
+):
+    try:
+        sequence = buff_svc.return_sequence_from_db(werk)
+        # loads the matrix here if it was invalidated, so its select does not hold the slot below
+        projection.current()
+        project = projection.totals if cumulative_only else projection.project
+        return FrameJSONResponse.cached(COMPUTE.run(project, sequence, horizon), request, orient)
+    except Exception as e:
+        raise HTTP_Exceptions().http_502("Erro ao projetar consumo", e)
+
+
+@router.get("/response/fx4pd", response_class=FrameJSONResponse)
 def get_fx4pd_response(
+    request: Request,
     svc: ReturnFX4PDValues = Depends(DependenciesInjection.get_fx4pd_service),
     limit: int = Query(5000, ge=1, le=100000),
+    orient: str = Query("rows", pattern="^(rows|columns)$", description="rows ou columns"),
 ):
     try:
-        df = BuildPipeline().build_forecast(svc).collect()
-        return df.head(limit).to_dicts()
+        df = COMPUTE.run(lambda: BuildPipeline().build_forecast(svc).collect())
+        return FrameJSONResponse.cached(df.head(limit), request, orient)
     except Exception as e:
         raise HTTP_Exceptions().http_502("Erro ao buscar origem (fx4pd)", e)
 
 
-@router.get("/response")
+@router.get("/response", response_class=FrameJSONResponse)
 def get_forecast_response(
+    request: Request,
     svc: DefineForecastValues = Depends(DependenciesInjection.get_forecast_service),
     limit: int = Query(5000, ge=1, le=100000),
+    offset: int = Query(0, ge=0),
+    werk: Optional[str] = Query(None, description="Filtra por planta"),
+    partnumber: Optional[List[str]] = Query(None, description="Filtra por peça"),
+    rack: Optional[List[str]] = Query(None, description="Filtra por rack"),
+    takt: Optional[List[str]] = Query(None, description="Filtra por takt"),
+    columns: Optional[List[str]] = Query(None, description="Colunas retornadas"),
+    orient: str = Query("rows", pattern="^(rows|columns)$", description="rows ou columns"),
 ):
     try:
-        df = svc.join_fx4pd_pkmc_pk05().collect()
-        return df.head(limit).to_dicts()
+        lf = svc.join_fx4pd_pkmc_pk05(
+            werk, columns=columns, partnumber=partnumber, rack=rack, takt=takt, limit=limit, offset=offset
+        )
+        df = COMPUTE.run(lf.collect)
+        return FrameJSONResponse.cached(df, request, orient)
+    except ValueError as e:
+        raise HTTP_Exceptions().http_400("Parâmetro inválido", e)
     except Exception as e:
         raise HTTP_Exceptions().http_502("Erro ao buscar origem (forecast)", e)
 
 
 @router.post("/upsert/fx4pd")
 def upsert_fx4pd(
-    batch_size: int = Query(10_000, ge=1, le=100_000),
+    batch_size: Optional[int] = Query(None, ge=1, le=100000, description="Vazio usa o tamanho ajustado automaticamente"),
     fx4pd_svc: ReturnFX4PDValues = Depends(DependenciesInjection.get_fx4pd_service),
-    upsert_svc: UpsertInfos = Depends(DependenciesInjection.get_upsert_service),
+    write_queues: WriteQueues = Depends(DependenciesInjection.get_write_queues),
 ):
     try:
-        df = BuildPipeline().build_forecast(fx4pd_svc)
-        rows = upsert_svc.upsert_df("fx4pd", df, batch_size)
+        df = COMPUTE.run(lambda: BuildPipeline().build_forecast(fx4pd_svc).collect())
+        flush = write_queues.submit("fx4pd", df, batch_size).result()
+        DependenciesInjection.get_projection_service().invalidate()
         return {
             "message": "Upsert concluído com sucesso.",
-            "rows": rows,
-            "batch_size": batch_size,
+            "rows": len(df),
+            "flush": flush,
             "table": "fx4pd",
         }
     except Exception as e:
@@ -69,17 +123,23 @@ def upsert_fx4pd(
 
 @router.post("/upsert")
 def upsert_forecast_pipeline(
-    batch_size: int = Query(10_000, ge=1, le=100_000),
+    batch_size: Optional[int] = Query(None, ge=1, le=100000, description="Vazio usa o tamanho ajustado automaticamente"),
     fx4pd_svc: ReturnFX4PDValues = Depends(DependenciesInjection.get_fx4pd_service),
     forecast_svc: DefineForecastValues = Depends(DependenciesInjection.get_forecast_service),
-    upsert_svc: UpsertInfos = Depends(DependenciesInjection.get_upsert_service),
+    write_queues: WriteQueues = Depends(DependenciesInjection.get_write_queues),
 ):
     try:
-        df_fx4pd = BuildPipeline().build_forecast(fx4pd_svc)
-        upsert_svc.upsert_df("fx4pd", df_fx4pd, batch_size)
-
-        df_forecast = forecast_svc.join_fx4pd_pkmc_pk05()
-        rows_forecast = upsert_svc.upsert_df("forecast", df_forecast, batch_size)
+        df_fx4pd = COMPUTE.run(lambda: BuildPipeline().build_forecast(fx4pd_svc).collect())
+        write_queues.submit("fx4pd", df_fx4pd, batch_size).result()
+        DependenciesInjection.get_projection_service().invalidate()
+
+        plants = df_fx4pd["werk"].cast(pl.Utf8).unique().to_list()
+        # one context copy per plant keeps the fx4pd write sticky to the primary in every worker
+        contexts = [copy_context() for _ in plants]
+        with ThreadPoolExecutor(max_workers=pool_workers(len(plants))) as executor:
+            rows_forecast = dict(zip(plants, executor.map(
+                lambda context, werk: context.run(BuildPipeline.build_plant_forecast, werk, batch_size), contexts, plants
+            )))
 
         return {
             "message": "Upsert concluído com sucesso.",
@@ -87,7 +147,6 @@ def upsert_forecast_pipeline(
                 "fx4pd": len(df_fx4pd),
                 "forecast": rows_forecast,
             },
-            "batch_size": batch_size,
             "tables": ["fx4pd", "forecast"],
         }
     except Exception as e:
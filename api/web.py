@@ -1,7 +1,13 @@
+from orchestrator.compute import COMPUTE
 from fastapi import FastAPI, File, UploadFile
 # from orchestrator.orchestrator import PipelinesOrchestrator, WorkersOrchestrator
-# from services.storage import ListExcelFiles, UploadFiles, DeleteFiles
+from services.storage import ListExcelFiles, UploadFiles
 from fastapi.middleware.gzip import GZipMiddleware
+from services.consumption.ledger import LEDGER
+from services.assembly.history import HISTORY
+from database.autotune import BATCH_TUNERS
+from database.replicas import REPLICAS
+from orchestrator.watcher import SourceWatcher
 
 from .routes.assembly import router as assembly_router
 from .routes.forecast import router as forecast_router
@@ -20,14 +26,66 @@ app.include_router(forecast_router, prefix="/forecast", tags=["forecast"])
 app.include_router(consumption_router, prefix="/consumption", tags=["consumption"])
 
 
-# # -- FILES -- 
-# @app.get("/files/list/", tags=["files"])
-# def list_files():
-#     return ListExcelFiles()._list_files()
+@app.on_event("startup")
+def start_ledger():
+    LEDGER.recover()
+    LEDGER.start()
 
-# @app.post("/files/upload/", tags=["files"])
-# def upload_files(file: UploadFile = File(...)):
-#     return UploadFiles()._upload_files(file)
+
+@app.on_event("startup")
+def start_watcher():
+    # built here, not at import, so importing the app does not resolve source paths or stat files
+    app.state.watcher = SourceWatcher()
+    app.state.watcher.start()
+
+
+@app.on_event("startup")
+def start_history():
+    HISTORY.start()
+
+
+@app.on_event("shutdown")
+def stop_ledger():
+    LEDGER.stop()
+
+
+@app.on_event("shutdown")
+def stop_watcher():
+    watcher = getattr(app.state, "watcher", None)
+    if watcher is not None:
+        watcher.stop()
+
+
+@app.on_event("shutdown")
+def stop_history():
+    HISTORY.stop()
+
+
+# -- COMPUTE --
+@app.get("/compute/stats", tags=["compute"])
+def compute_stats():
+    return COMPUTE.stats()
+
+
+# -- DATABASE --
+@app.get("/database/write-metrics", tags=["database"])
+def write_metrics():
+    return BATCH_TUNERS.metrics()
+
+
+@app.get("/database/replicas", tags=["database"])
+def replica_status():
+    return REPLICAS.status()
+
+
+# -- FILES --
+@app.get("/files/list/", tags=["files"])
+def list_files():
+    return ListExcelFiles()._list_files()
+
+@app.post("/files/upload/", tags=["files"])
+def upload_files(file: UploadFile = File(...)):
+    return UploadFiles()._upload_files(file)
 
 # @app.delete("/delete/{filename}", tags=["files"])
 # def delete_files(filename):
@@ -0,0 +1,121 @@
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+import argparse, json, os, random, tempfile, time
+
+import numpy as np
+
+import orchestrator.compute  # sizes POLARS_MAX_THREADS before anything imports polars
+from .standin import create_tables, install, seed
+from .stubs import AssemblyLineStub
+
+
+ROOT = Path(__file__).resolve().parents[2]
+
+DEFAULT_MIX = {
+    "GET /assembly/response/processed": 3,
+    "POST /assembly/upsert": 1,
+    "GET /assembly/events": 1,
+    "GET /forecast/response": 2,
+    "GET /forecast/response/buff_al": 2,
+    "GET /consumption/response/to-consume": 2,
+    "PUT /consumption/update/to-consume": 1,
+}
+
+
+def prepare_environment(workdir: Path, args):
+    db_path = str(workdir / "alf.sqlite")
+    create_tables(db_path)
+    cars = seed(db_path, args.cars, args.parts, args.parts_per_car, random.Random(args.seed))
+    install(db_path)
+
+    stub = AssemblyLineStub(cars)
+    excel = ROOT / "storage" / "excel"
+    os.environ.update({
+        "AL_API_ENDPOINT": stub.start(),
+        "EXCEL_PATH": str(workdir),
+        "PKMC_PATH": str(excel / "PKMC.XLSX"),
+        "PK05_PATH": str(excel / "PK05.XLSX"),
+        "FX4PD_PATH": str(excel / "FX4PD.xlsx"),
+        "SNAPSHOT_HISTORY_PATH": str(workdir / "history"),
+        "USERNAME": os.getenv("USERNAME", "loadtest"),
+    })
+    return stub
+
+
+def summarize(samples, elapsed):
+    routes = {}
+    for route, latencies, errors in samples:
+        ms = np.array(latencies) * 1000 if latencies else np.array([np.nan])
+        routes[route] = {
+            "requests": len(latencies),
+            "errors": errors,
+            "p50_ms": float(np.nanpercentile(ms, 50)),
+            "p95_ms": float(np.nanpercentile(ms, 95)),
+            "p99_ms": float(np.nanpercentile(ms, 99)),
+            "mean_ms": float(np.nanmean(ms)),
+        }
+    total = sum(r["requests"] for r in routes.values())
+    return {"elapsed_s": elapsed, "requests": total, "throughput_rps": total / elapsed, "routes": routes}
+
+
+def run_level(client, mix, concurrency, requests, rng_seed):
+    rng = random.Random(rng_seed)
+    routes, weights = list(mix), list(mix.values())
+    plan = rng.choices(routes, weights=weights, k=requests)
+    latencies = {route: [] for route in routes}
+    errors = {route: 0 for route in routes}
+
+    def call(route):
+        method, path = route.split(" ", 1)
+        started = time.perf_counter()
+        response = client.request(method, path)
+        return route, time.perf_counter() - started, response.status_code
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        for route, latency, status in executor.map(call, plan):
+            latencies[route].append(latency)
+            if status >= 400:
+                errors[route] += 1
+    elapsed = time.perf_counter() - started
+
+    return summarize([(route, latencies[route], errors[route]) for route in routes], elapsed)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="In-process load test for api.web:app")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 16])
+    parser.add_argument("--requests", type=int, default=200, help="requests per concurrency level")
+    parser.add_argument("--mix", type=json.loads, default=DEFAULT_MIX, help='JSON map "METHOD /path" -> weight')
+    parser.add_argument("--cars", type=int, default=2000)
+    parser.add_argument("--parts", type=int, default=3000)
+    parser.add_argument("--parts-per-car", type=int, default=40)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--out", default="loadtest.json")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        stub = prepare_environment(Path(tmp), args)
+        try:
+            from fastapi.testclient import TestClient
+            from api.web import app
+
+            with TestClient(app) as client:
+                client.request("POST", "/assembly/upsert")
+                levels = {
+                    str(concurrency): run_level(client, args.mix, concurrency, args.requests, args.seed)
+                    for concurrency in args.concurrency
+                }
+        finally:
+            stub.stop()
+
+    report = {
+        "config": {k: v for k, v in vars(args).items() if k != "out"},
+        "levels": levels,
+    }
+    Path(args.out).write_text(json.dumps(report, indent=2), encoding="utf-8")
+    print(json.dumps({c: round(l["throughput_rps"], 1) for c, l in levels.items()}))
+
+
+if __name__ == "__main__":
+    main()
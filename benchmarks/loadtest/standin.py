@@ -0,0 +1,154 @@
+from database.connector import MySQL_Connector
+from database.schema import TABLE_KEYS
+import random, re, sqlite3
+
+
+# -- SQLITE STAND-IN FOR MYSQL - ONLY THE DIALECT THE REPO ACTUALLY EMITS --
+TABLE_COLUMNS = {
+    "assembly_line": ["knr_fx4pd", "knr", "model", "lfdnr_sequence", "werk", "spj", "lane", "takt"],
+    "fx4pd": ["werk", "knr_fx4pd", "partnumber", "qty_usage", "qty_unit"],
+    "pkmc": [
+        "partnumber", "id", "supply_area", "num_reg_circ", "deposit_type", "deposit_position",
+        "container", "description", "pack_standard", "qty_per_box", "qty_max_box",
+        "total_theoretical_qty", "qty_for_restock", "rack", "lb_balance", "updated_at",
+    ],
+    "pk05": ["supply_area", "id", "deposit", "responsible", "discharge_point", "description", "takt", "updated_at"],
+    "forecast": [
+        "werk", "knr_fx4pd", "partnumber", "qty_usage", "qty_unit", "num_reg_circ", "takt", "rack",
+        "lb_balance", "total_theoretical_qty", "qty_for_restock", "qty_per_box", "qty_max_box",
+    ],
+}
+
+UPSERT_CLAUSE = re.compile(r"ON DUPLICATE KEY UPDATE\s+(.*?);?\s*$", re.S)
+
+
+def translate(sql):
+    sql = sql.replace("auto_line_feeding.", "").replace("%s", "?")
+    sql = re.sub(r"\bGREATEST\(", "MAX(", sql)
+    match = UPSERT_CLAUSE.search(sql)
+    if match:
+        columns = re.findall(r"(\w+)=VALUES\(\1\)", match.group(1))
+        sql = sql[:match.start()] + "ON CONFLICT DO UPDATE SET " + ", ".join(f"{c}=excluded.{c}" for c in columns)
+    return sql
+
+
+class StandInCursor:
+    def __init__(self, connection, dictionary=False):
+        self.cursor = connection.cursor()
+        self.dictionary = dictionary
+
+    @property
+    def column_names(self):
+        return tuple(d[0] for d in self.cursor.description or ())
+
+    def execute(self, sql, params=None):
+        self.cursor.execute(translate(sql), tuple(params or ()))
+
+    def executemany(self, sql, rows):
+        self.cursor.executemany(translate(sql), rows)
+
+    def fetchall(self):
+        rows = self.cursor.fetchall()
+        if self.dictionary:
+            return [dict(zip(self.column_names, row)) for row in rows]
+        return rows
+
+    def fetchone(self):
+        return self.cursor.fetchone()
+
+    def close(self):
+        self.cursor.close()
+
+
+class StandInConnection:
+    def __init__(self, path):
+        self.connection = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+
+    def cursor(self, dictionary=False):
+        return StandInCursor(self.connection, dictionary)
+
+    def commit(self):
+        self.connection.commit()
+
+    def rollback(self):
+        self.connection.rollback()
+
+    def close(self):
+        self.connection.close()
+
+
+def create_tables(path):
+    connection = sqlite3.connect(path)
+    for table, columns in TABLE_COLUMNS.items():
+        definitions = [
+            f"{col} TEXT DEFAULT CURRENT_TIMESTAMP" if col == "updated_at" else col
+            for col in columns
+        ]
+        connection.execute(
+            f"CREATE TABLE IF NOT EXISTS {table} ({', '.join(definitions)}, "
+            f"PRIMARY KEY ({', '.join(TABLE_KEYS[table])}))"
+        )
+    connection.execute("CREATE INDEX IF NOT EXISTS idx_assembly_line_lane ON assembly_line (lane)")
+    connection.execute(
+        "CREATE TABLE IF NOT EXISTS lm01_requests (id INTEGER PRIMARY KEY AUTOINCREMENT, partnumber, num_reg_circ, "
+        "boxes, requested_at TEXT DEFAULT CURRENT_TIMESTAMP, status TEXT DEFAULT 'pending', "
+        "updated_at TEXT DEFAULT CURRENT_TIMESTAMP)"
+    )
+    connection.commit()
+    connection.close()
+
+
+def seed(path, cars, parts, parts_per_car, rng: random.Random, plants=("11", "12")):
+    partnumbers = [f"5G{rng.randrange(10**7):07d}{chr(65 + i % 26)}" for i in range(parts)]
+    supply_areas = [f"P{i % 400:03d}{chr(65 + i % 4)}" for i in range(parts)]
+
+    pkmc = []
+    for i, (partnumber, supply_area) in enumerate(zip(partnumbers, supply_areas)):
+        per_box, max_box = rng.choice([10, 20, 50, 100]), rng.randint(2, 8)
+        pkmc.append((
+            partnumber, i, supply_area, f"{100000 + i}", "B01", f"LB{i:05d}", "C1",
+            f"part {i}", "STD", per_box, max_box, per_box * max_box, per_box * (max_box - 1),
+            supply_area, rng.randint(0, per_box * max_box),
+        ))
+    pk05 = [(sa, i, "LB01", "ALF", "D1", f"area {sa} T{i % 60 + 1:02d}", f"T{i % 60 + 1:02d}")
+            for i, sa in enumerate(dict.fromkeys(supply_areas))]
+
+    car_keys = [(rng.choice(plants), f"{rng.randint(20, 26)}", f"{1000000 + i}") for i in range(cars)]
+    fx4pd = [
+        (car[0], "".join(car), partnumber, float(rng.randint(1, 4)), 1)
+        for car in car_keys
+        for partnumber in rng.sample(partnumbers, min(parts_per_car, parts))
+    ]
+
+    by_part = {row[0]: row for row in pkmc}
+    forecast = []
+    for werk, knr_fx4pd, partnumber, qty, unit in fx4pd:
+        row = by_part[partnumber]
+        forecast.append((
+            werk, knr_fx4pd, partnumber, qty, unit, row[3], f"T{rng.randint(1, 60):02d}",
+            row[13], row[14], row[11], row[12], row[9], row[10],
+        ))
+
+    connection = sqlite3.connect(path)
+    for table, rows, columns in [
+        ("pkmc", pkmc, TABLE_COLUMNS["pkmc"][:-1]),
+        ("pk05", pk05, TABLE_COLUMNS["pk05"][:-1]),
+        ("fx4pd", fx4pd, TABLE_COLUMNS["fx4pd"]),
+        ("forecast", forecast, TABLE_COLUMNS["forecast"]),
+    ]:
+        connection.executemany(
+            f"INSERT OR REPLACE INTO {table} ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})",
+            rows,
+        )
+    connection.commit()
+    connection.close()
+    return car_keys
+
+
+def install(path):
+    def connect(self):
+        return StandInConnection(path)
+
+    MySQL_Connector.get_connection = connect
+    MySQL_Connector.get_pooled_connection = connect
@@ -0,0 +1,62 @@
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from threading import Lock, Thread
+import json
+
+
+# -- ASSEMBLY-LINE API STUB - CARS ADVANCE ONE TAKT PER REQUEST --
+class AssemblyLineStub:
+    def __init__(self, cars, lanes: int = 4, takts_per_lane: int = 15, reception: int = 60):
+        self.cars = cars
+        self.lanes = lanes
+        self.takts_per_lane = takts_per_lane
+        self.reception = reception
+        self.offset = 0
+        self.lock = Lock()
+        self.server = None
+
+    def _car(self, index):
+        werk, spj, knr = self.cars[index % len(self.cars)]
+        return {"KNR": knr, "MODELL": f"M{index % 3}", "LFDNR": index, "WERK": werk, "SPJ": spj}
+
+    def snapshot(self):
+        with self.lock:
+            offset = self.offset
+            self.offset += 1
+
+        body = {}
+        position = offset
+        for lane in range(1, self.lanes + 1):
+            takts = {}
+            for takt in range(1, self.takts_per_lane + 1):
+                takts[f"T{takt:02d}"] = {"CAR": self._car(position), "LANE": str(lane), "TACT": f"T{takt:02d}"}
+                position += 1
+            body[f"lane_{lane}"] = {"FB1": takts}
+
+        body["reception"] = {"FB0": {
+            f"R{slot:03d}": {"CAR": self._car(position + slot), "LANE": "reception", "TACT": f"R{slot:03d}"}
+            for slot in range(self.reception)
+        }}
+        return body
+
+    def start(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                payload = json.dumps(stub.snapshot()).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        Thread(target=self.server.serve_forever, daemon=True).start()
+        return f"http://127.0.0.1:{self.server.server_port}/"
+
+    def stop(self):
+        if self.server:
+            self.server.shutdown()
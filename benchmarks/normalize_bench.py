@@ -0,0 +1,76 @@
+from helpers.data.normalize import Normalize
+import argparse, json, random, re, time
+import polars as pl
+
+
+# -- LEGACY CHAINS, AS THEY WERE IN THE CLEANERS BEFORE helpers/data/normalize.py --
+LEGACY = {
+    "partnumber": pl.col("partnumber")
+        .cast(pl.Utf8)
+        .str.strip_chars()
+        .str.replace_all(r"\s+", "")
+        .str.replace_all(r"\.", "")
+        .str.replace_all(r"[^\w-]", "")
+        .str.to_uppercase(),
+    "qty_max_box": pl.col("qty_max_box")
+        .cast(pl.Utf8)
+        .str.replace_all(r"(?i)max", "")
+        .str.replace_all(r"[ :]", "")
+        .str.replace_all(r"\D+", "")
+        .cast(pl.Int64, strict=False)
+        .fill_null(0),
+}
+
+FUSED = {
+    "partnumber": Normalize.partnumber("partnumber"),
+    "qty_max_box": Normalize.digits("qty_max_box"),
+}
+
+
+def string_passes(expr: pl.Expr) -> int:
+    # every .str.* call in the expression plan is one pass over the column
+    return len(re.findall(r"\.str\.", str(expr)))
+
+
+def generate(rows, rng: random.Random):
+    return pl.DataFrame({
+        "partnumber": [
+            f" {rng.choice(['5g', '5G', '1k'])}{rng.randrange(10**3):03d}.{rng.randrange(10**3):03d}"
+            f".{rng.randrange(100):02d} {rng.choice(['A', 'b', '', '-C'])} "
+            for _ in range(rows)
+        ],
+        "qty_max_box": [f"{rng.choice(['MAX', 'max', 'Max'])}: {rng.randint(1, 12)}" for _ in range(rows)],
+    })
+
+
+def timed(df, expr, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        out = df.select(expr)
+        best = min(best, time.perf_counter() - started)
+    return best, out
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Legacy vs fused string normalisation")
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    df = generate(args.rows, random.Random(0))
+    report = {}
+    for column in LEGACY:
+        legacy_s, legacy_out = timed(df, LEGACY[column], args.repeat)
+        fused_s, fused_out = timed(df, FUSED[column], args.repeat)
+        report[column] = {
+            "passes": {"legacy": string_passes(LEGACY[column]), "fused": string_passes(FUSED[column])},
+            "legacy_ms": legacy_s * 1000,
+            "fused_ms": fused_s * 1000,
+            "identical": legacy_out.equals(fused_out),
+        }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+from datetime import datetime, timedelta
+from services.assembly.differ import AssemblyDeltaSync, AssemblyEventLog, SnapshotDiffer
+from services.assembly.history import HISTORY, SnapshotReplay
+from services.consumption.consumer import ConsumeValues
+from services.consumption.ledger import LEDGER
+import argparse, json, os, time
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay a recorded day of assembly snapshots through the consumption cycle")
+    parser.add_argument("--day", type=lambda s: datetime.strptime(s, "%Y-%m-%d"), required=True)
+    parser.add_argument("--hours", type=float, default=24)
+    parser.add_argument("--speed", type=float, default=0, help="x real time, 0 = as fast as possible")
+    parser.add_argument("--werk", default=None)
+    parser.add_argument("--batch-size", type=int, default=None, help="fixed batch size, default autotuned")
+    parser.add_argument("--standin", default=os.getenv("REPLAY_STANDIN", "storage/replay.sqlite"),
+                        help="sqlite copy to replay against, created empty if missing")
+    parser.add_argument("--live", action="store_true", help="replay against the configured MySQL instead of the stand-in")
+    parser.add_argument("--flush", action="store_true", help="write ledger balances back to pkmc at the end")
+    args = parser.parse_args()
+
+    # the replay writes assembly_line and pkmc, so MySQL is only touched when asked for explicitly
+    if not args.live:
+        from .loadtest.standin import create_tables, install
+        create_tables(args.standin)
+        install(args.standin)
+
+    LEDGER.recover()
+    # its own differ and event log, so the replay never shares state with the live delta sync
+    delta_sync = AssemblyDeltaSync(SnapshotDiffer(), AssemblyEventLog())
+    replay = SnapshotReplay(HISTORY, delta_sync, ConsumeValues(LEDGER), args.speed)
+
+    started = time.perf_counter()
+    timings = replay.run(args.day, args.day + timedelta(hours=args.hours), args.werk, args.batch_size)
+    elapsed = time.perf_counter() - started
+
+    if args.flush:
+        LEDGER.flush()
+
+    if not len(timings):
+        print(json.dumps({"snapshots": 0}))
+        return
+
+    recorded = (timings["captured_at"].max() - timings["captured_at"].min()).total_seconds()
+    print(json.dumps({
+        "snapshots": len(timings),
+        "recorded_s": recorded,
+        "elapsed_s": elapsed,
+        "speedup": recorded / elapsed if elapsed else None,
+        "sync_ms_p50": timings["sync_ms"].median(),
+        "sync_ms_p95": timings["sync_ms"].quantile(0.95),
+        "consume_ms_p50": timings["consume_ms"].median(),
+        "consume_ms_p95": timings["consume_ms"].quantile(0.95),
+        "events": int(timings["entered"].sum() + timings["moved"].sum() + timings["exited"].sum()),
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+from pathlib import Path
+import argparse, json, os, random, tempfile, time
+
+import orchestrator.compute  # sizes POLARS_MAX_THREADS before anything imports polars
+from .loadtest.standin import create_tables, install, seed
+from services.workers.sap.fake import FakeLauncher, FakeSAPApplication
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Drive a full sap_worker cycle on the fake SAP backend and the sqlite stand-in")
+    parser.add_argument("--sessions", type=int, default=3)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds per scripted GUI action")
+    parser.add_argument("--parts", type=int, default=500)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        db_path = str(Path(workdir) / "alf.sqlite")
+        create_tables(db_path)
+        seed(db_path, cars=50, parts=args.parts, parts_per_car=10, rng=random.Random(args.seed))
+        install(db_path)
+        os.environ["SAP_PATH"] = workdir
+
+        from services.workers.sap.worker import initialize_sap_pool, sap_worker
+
+        app = FakeSAPApplication(latency=args.latency)
+        launcher = FakeLauncher(app)
+        pool = initialize_sap_pool(args.sessions, launcher)
+
+        started = time.perf_counter()
+        sap_worker(pool)
+        elapsed = time.perf_counter() - started
+
+        sessions = {}
+        for session, transaction in sorted(app.transactions()):
+            sessions.setdefault(session, []).append(transaction)
+        print(json.dumps({
+            "elapsed_s": elapsed,
+            "actions": len(app.actions),
+            "transactions_by_session": sessions,
+            "open_sessions": app.Children(0).Children.Count,
+        }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+from threading import Lock
+from mysql.connector import errors
+import polars as pl, os, time
+
+
+# ER_LOCK_DEADLOCK, ER_LOCK_WAIT_TIMEOUT
+RETRYABLE_ERRNOS = {1213, 1205}
+
+DEFAULT_MAX_ALLOWED_PACKET = 4 * 1024 * 1024
+
+
+# -- BATCH AUTOTUNER - BYTES/ROW AND max_allowed_packet CAP THE SIZE, COMMIT LATENCY MOVES IT --
+class BatchAutotuner:
+    def __init__(self, table, operation, initial: int = 1000, minimum: int = 50, maximum: int = 50_000,
+                 target_seconds: float = None, packet_bytes: int = DEFAULT_MAX_ALLOWED_PACKET):
+        self.table = table
+        self.operation = operation
+        self.batch_size = initial
+        self.minimum = minimum
+        self.maximum = maximum
+        self.target_seconds = target_seconds or float(os.getenv("BATCH_TARGET_SECONDS", "0.5"))
+        self.packet_bytes = packet_bytes
+        self.bytes_per_row = None
+        self.lock = Lock()
+        self.stats = {"batches": 0, "rows": 0, "seconds": 0.0, "lock_waits": 0, "grows": 0, "shrinks": 0, "last_ms": 0.0}
+
+    def _packet_cap(self):
+        if not self.bytes_per_row:
+            return self.maximum
+        # half the packet leaves room for the statement text and escaping
+        return max(self.minimum, int(self.packet_bytes * 0.5 / self.bytes_per_row))
+
+    def observe(self, df: pl.DataFrame):
+        if not len(df):
+            return
+        # estimated_size is the in-memory width; quoting and separators add a few bytes per value
+        estimate = df.estimated_size() / len(df) + 4 * len(df.columns) + 4
+        with self.lock:
+            self.bytes_per_row = estimate if self.bytes_per_row is None else 0.8 * self.bytes_per_row + 0.2 * estimate
+
+    def size(self) -> int:
+        with self.lock:
+            return max(self.minimum, min(self.batch_size, self.maximum, self._packet_cap()))
+
+    def record(self, rows: int, seconds: float, size: int = None):
+        with self.lock:
+            self.stats["batches"] += 1
+            self.stats["rows"] += rows
+            self.stats["seconds"] += seconds
+            self.stats["last_ms"] = seconds * 1000
+
+            # only a full batch says anything about the current size
+            if rows < (size or self.batch_size):
+                return
+            if seconds > self.target_seconds:
+                self.batch_size = max(self.minimum, int(self.batch_size * max(0.5, self.target_seconds / seconds)))
+                self.stats["shrinks"] += 1
+            elif seconds < self.target_seconds / 2:
+                self.batch_size = min(self.maximum, self._packet_cap(), int(self.batch_size * 1.5) + 1)
+                self.stats["grows"] += 1
+
+    def record_lock_wait(self):
+        with self.lock:
+            self.batch_size = max(self.minimum, self.batch_size // 2)
+            self.stats["lock_waits"] += 1
+            self.stats["shrinks"] += 1
+
+    def run(self, df: pl.DataFrame, write, retries: int = 3, sizes: list = None):
+        self.observe(df)
+        offset, total = 0, len(df)
+        while offset < total:
+            for attempt in range(retries + 1):
+                size = self.size()
+                batch = df.slice(offset, size)
+                started = time.perf_counter()
+                try:
+                    write(batch)
+                except errors.DatabaseError as e:
+                    if e.errno not in RETRYABLE_ERRNOS or attempt == retries:
+                        raise
+                    self.record_lock_wait()
+                    time.sleep(0.05 * 2 ** attempt)
+                    continue
+                self.record(len(batch), time.perf_counter() - started, size)
+                if sizes is not None:
+                    sizes.append(size)
+                break
+            offset += len(batch)
+        return total
+
+    def metrics(self):
+        with self.lock:
+            return {
+                "batch_size": max(self.minimum, min(self.batch_size, self.maximum, self._packet_cap())),
+                "bytes_per_row": round(self.bytes_per_row, 1) if self.bytes_per_row else None,
+                "packet_cap": self._packet_cap(),
+                "target_ms": self.target_seconds * 1000,
+                **self.stats,
+            }
+
+
+class BatchTuners:
+    def __init__(self):
+        self.tuners = {}
+        self.packet_bytes = None
+        self.lock = Lock()
+
+    def _max_allowed_packet(self, connection):
+        if self.packet_bytes is None:
+            cursor = connection.cursor()
+            try:
+                cursor.execute("SELECT @@max_allowed_packet")
+                self.packet_bytes = int(cursor.fetchone()[0])
+            except Exception:
+                self.packet_bytes = DEFAULT_MAX_ALLOWED_PACKET
+            finally:
+                cursor.close()
+        return self.packet_bytes
+
+    def get(self, table, operation, connection=None) -> BatchAutotuner:
+        with self.lock:
+            key = (table, operation)
+            if key not in self.tuners:
+                packet = self._max_allowed_packet(connection) if connection is not None else DEFAULT_MAX_ALLOWED_PACKET
+                self.tuners[key] = BatchAutotuner(table, operation, packet_bytes=packet)
+            return self.tuners[key]
+
+    def metrics(self):
+        with self.lock:
+            tuners = list(self.tuners.values())
+        return {f"{t.table}.{t.operation}": t.metrics() for t in tuners}
+
+
+BATCH_TUNERS = BatchTuners()
@@ -1,15 +1,36 @@
-import mysql.connector, os
+import mysql.connector, os, time
+from mysql.connector import errors, pooling
+from threading import Lock
 from dotenv import load_dotenv
 
 load_dotenv("config/.env")
 
+MYSQL_POOL_SIZE = int(os.getenv("MYSQL_POOL_SIZE", "8"))
+MYSQL_POOL_TIMEOUT = float(os.getenv("MYSQL_POOL_TIMEOUT", "30"))
+
+
+def pool_workers(requested):
+    # fan-outs never run more threads than the pool has connections
+    return max(1, min(requested, MYSQL_POOL_SIZE))
+
+
 class MySQL_Connector:
+    pool = None
+    pool_lock = Lock()
+
     def __init__(self):
         self.host = os.getenv("MYSQL_HOST")
         self.user = os.getenv("MYSQL_USER")
         self.password = os.getenv("MYSQL_PSWD")
         self.database = os.getenv("MYSQL_DATABASE")
-        self.connection = self.get_connection()
+        self._connection = None
+
+    # the primary is only opened when used, readers served by a replica never touch it
+    @property
+    def connection(self):
+        if self._connection is None:
+            self._connection = self.get_connection()
+        return self._connection
 
     def get_connection(self):
         return mysql.connector.connect(
@@ -17,4 +38,28 @@ class MySQL_Connector:
             user=self.user,
             password=self.password,
             database=self.database
-        )
\ No newline at end of file
+        )
+
+    def get_pooled_connection(self):
+        with MySQL_Connector.pool_lock:
+            if MySQL_Connector.pool is None:
+                MySQL_Connector.pool = pooling.MySQLConnectionPool(
+                    pool_name="alf",
+                    pool_size=MYSQL_POOL_SIZE,
+                    host=self.host,
+                    user=self.user,
+                    password=self.password,
+                    database=self.database
+                )
+
+        # mysql.connector raises at once when the pool is empty, wait for a connection to come back instead
+        deadline = time.monotonic() + MYSQL_POOL_TIMEOUT
+        delay = 0.01
+        while True:
+            try:
+                return MySQL_Connector.pool.get_connection()
+            except errors.PoolError:
+                if time.monotonic() >= deadline:
+                    raise
+                time.sleep(delay)
+                delay = min(delay * 2, 0.5)
@@ -1,14 +1,28 @@
-import polars as pl
-from database.connector import MySQL_Connector
+import polars as pl, time
+from concurrent.futures import ThreadPoolExecutor
+from mysql.connector import errors
+from database.autotune import BATCH_TUNERS, RETRYABLE_ERRNOS
+from database.connector import MySQL_Connector, pool_workers
+from database.replicas import REPLICAS, mark_write
+from database.schema import TABLE_KEYS
+from helpers.data.registry import SchemaRegistry
 
 
 class UpsertInfos(MySQL_Connector):
     def __init__(self):
         MySQL_Connector.__init__(self)
 
-    def upsert_df(self, table, df, batch_size):
+    def upsert_df(self, table, df, batch_size=None, parallelism=1, retries=3):
         if isinstance(df, pl.LazyFrame):
             df = df.collect()
+        mark_write()
+
+        if parallelism > 1 and len(df) > (batch_size or BATCH_TUNERS.get(table, "upsert", self.connection).size()):
+            return self._upsert_parallel(table, df, batch_size, parallelism, retries)
+
+        if batch_size is None:
+            tuner = BATCH_TUNERS.get(table, "upsert", self.connection)
+            return tuner.run(df, lambda batch: self._upsert_batch(table, batch), retries)
 
         total_rows = len(df)
         for i in range(0, total_rows, batch_size):
@@ -16,58 +30,244 @@ class UpsertInfos(MySQL_Connector):
             self._upsert_batch(table, batch)
         return total_rows
 
-    def _upsert_batch(self, table, df):
+    def _partition(self, table, df, parallelism):
+        # rows with the same primary key always land in the same partition,
+        # so concurrent partitions never lock the same index records
+        keys = TABLE_KEYS.get(table, [df.columns[0]])
+        return (
+            df.with_columns((pl.struct(keys).hash() % parallelism).alias("_partition"))
+            .partition_by("_partition", include_key=False)
+        )
+
+    def _upsert_partition(self, table, df, batch_size, retries):
+        connection = self.get_pooled_connection()
+        try:
+            if batch_size is None:
+                tuner = BATCH_TUNERS.get(table, "upsert", connection)
+                return tuner.run(df, lambda batch: self._upsert_batch(table, batch, connection), retries)
+
+            for i in range(0, len(df), batch_size):
+                batch = df.slice(i, batch_size)
+                for attempt in range(retries + 1):
+                    try:
+                        self._upsert_batch(table, batch, connection)
+                        break
+                    except errors.DatabaseError as e:
+                        if e.errno not in RETRYABLE_ERRNOS or attempt == retries:
+                            raise
+                        time.sleep(0.05 * 2 ** attempt)
+        finally:
+            connection.close()
+        return len(df)
+
+    def _upsert_parallel(self, table, df, batch_size, parallelism, retries):
+        partitions = self._partition(table, df, parallelism)
+        with ThreadPoolExecutor(max_workers=pool_workers(parallelism)) as executor:
+            futures = [
+                executor.submit(self._upsert_partition, table, partition, batch_size, retries)
+                for partition in partitions
+            ]
+            return sum(future.result() for future in futures)
+
+    # all frames in one transaction, returns (rows, batch sizes used); a deadlock or
+    # lock wait timeout rolls everything back, so the retry starts from the first frame
+    def upsert_transaction(self, table, frames, batch_size=None, retries=3):
         if not table.replace("_", "").isalnum():
-            return
+            raise ValueError("Nome de tabela inválido")
 
-        values = df.rows()
+        tuner = BATCH_TUNERS.get(table, "transaction", self.connection) if batch_size is None else None
+        for attempt in range(retries + 1):
+            try:
+                return self._upsert_transaction(table, frames, batch_size, tuner)
+            except errors.DatabaseError as e:
+                if e.errno not in RETRYABLE_ERRNOS or attempt == retries:
+                    raise
+                if tuner:
+                    tuner.record_lock_wait()
+                time.sleep(0.05 * 2 ** attempt)
 
-        columns = ", ".join(df.columns)
-        placeholders = ", ".join(["%s"] * len(df.columns))
-        update_clause = ", ".join([f"{col}=VALUES({col})" for col in df.columns])
+    def _upsert_transaction(self, table, frames, batch_size, tuner):
+        total_rows, timings = 0, []
+        cursor = self.connection.cursor()
+        try:
+            for df in frames:
+                sql = self._upsert_sql(table, df.columns)
+                if tuner:
+                    tuner.observe(df)
+                i = 0
+                while i < len(df):
+                    size = tuner.size() if tuner else batch_size
+                    batch = df.slice(i, size)
+                    started = time.perf_counter()
+                    cursor.executemany(sql, batch.rows())
+                    timings.append((len(batch), time.perf_counter() - started, size))
+                    i += len(batch)
+                total_rows += len(df)
 
-        sql = f"""
-            INSERT INTO {table} ({columns})
+            started = time.perf_counter()
+            self.connection.commit()
+            committed = time.perf_counter() - started
+        except Exception:
+            self.connection.rollback()
+            raise
+        finally:
+            cursor.close()
+
+        # the commit is where the rows get flushed, its time is shared out over the batches by rows
+        if tuner:
+            for rows, seconds, size in timings:
+                tuner.record(rows, seconds + committed * rows / total_rows, size)
+        return total_rows, sorted({size for _, _, size in timings})
+
+    def _upsert_sql(self, table, columns):
+        placeholders = ", ".join(["%s"] * len(columns))
+        update_clause = ", ".join([f"{col}=VALUES({col})" for col in columns])
+
+        return f"""
+            INSERT INTO {table} ({", ".join(columns)})
             VALUES ({placeholders})
             ON DUPLICATE KEY UPDATE {update_clause};
         """
 
-        cursor = self.connection.cursor()
+    def _upsert_batch(self, table, df, connection=None):
+        if not table.replace("_", "").isalnum():
+            return
+
+        connection = connection or self.connection
+        values = df.rows()
+        sql = self._upsert_sql(table, df.columns)
+
+        cursor = connection.cursor()
         try:
             cursor.executemany(sql, values)
-            self.connection.commit()
+            connection.commit()
         except Exception as e:
-            self.connection.rollback()
+            connection.rollback()
             raise
         finally:
             cursor.close()
 
 
+# -- SELECT BUILDER - ONLY WHITELISTED COLUMNS REACH THE SQL TEXT, VALUES ARE BOUND --
+class SelectQuery:
+    def __init__(self, source, columns, where=None, params=None, order_by=None):
+        self.source = source
+        self.columns = columns
+        self.selected = list(columns)
+        self.conditions = list(where or [])
+        self.params = list(params or [])
+        self.order_by = order_by
+        self.limit_value = None
+        self.offset_value = 0
+
+    def _expr(self, column):
+        if column not in self.columns:
+            raise ValueError(f"Coluna inválida: {column}")
+        return self.columns[column]
+
+    def select(self, columns=None):
+        if columns:
+            for column in columns:
+                self._expr(column)
+            self.selected = list(dict.fromkeys(columns))
+        return self
+
+    def where(self, column, value):
+        # query strings arrive as "" when a filter is left blank, that means no filter
+        if value is None or value == "":
+            return self
+        if isinstance(value, (list, tuple, set)):
+            values = [v for v in value if v is not None and v != ""]
+            if not values:
+                return self
+            self.conditions.append(f"{self._expr(column)} IN ({', '.join(['%s'] * len(values))})")
+            self.params.extend(values)
+        else:
+            self.conditions.append(f"{self._expr(column)} = %s")
+            self.params.append(value)
+        return self
+
+    def limit(self, limit=None, offset=0):
+        self.limit_value = limit
+        self.offset_value = offset or 0
+        return self
+
+    def build(self):
+        sql = "SELECT " + ", ".join(
+            f"{self.columns[c]} AS {c}" if self.columns[c] != c else c for c in self.selected
+        ) + f" FROM {self.source}"
+        params = list(self.params)
+
+        if self.conditions:
+            sql += " WHERE " + " AND ".join(self.conditions)
+        if self.order_by:
+            sql += f" ORDER BY {self.order_by}"
+        if self.limit_value is not None:
+            sql += " LIMIT %s OFFSET %s"
+            params.extend([int(self.limit_value), int(self.offset_value)])
+        return sql, tuple(params) or None
+
+
 class SelectInfos(MySQL_Connector):
     def __init__(self):
         MySQL_Connector.__init__(self)
 
-    def select_bd_infos(self, query):
-        cursor = self.connection.cursor()
+    def select_bd_infos(self, query, params=None, primary=False):
+        replica = REPLICAS.choose(primary)
+        if replica is not None:
+            try:
+                connection = REPLICAS.connection(replica)
+            except errors.PoolError:
+                # a busy pool is not a broken replica, this read just goes to the primary
+                REPLICAS.count("exhausted")
+            except Exception as e:
+                REPLICAS.mark_failed(replica, e)
+            else:
+                try:
+                    return self._select(connection, query, params)
+                except Exception as e:
+                    # retried once on the primary; only a lost connection benches the replica
+                    if isinstance(e, (errors.InterfaceError, errors.OperationalError)):
+                        REPLICAS.mark_failed(replica, e)
+                    REPLICAS.count("fallback")
+                finally:
+                    connection.close()
+        return self._select(self.connection, query, params)
+
+    def _select(self, connection, query, params=None):
+        cursor = connection.cursor()
         try:
-            cursor.execute(query)
+            cursor.execute(query, params)
             rows = cursor.fetchall()
             cols = cursor.column_names
-            return pl.DataFrame(rows, schema=cols).lazy()
+            return SchemaRegistry.apply(pl.DataFrame(rows, schema=cols, orient="row")).lazy()
         finally:
             cursor.close()
 
+    def select_query(self, query: SelectQuery):
+        return self.select_bd_infos(*query.build())
+
+    def select_plants(self, table="assembly_line"):
+        if not table.replace("_", "").isalnum():
+            raise ValueError("Nome de tabela inválido")
+        return self.select_bd_infos(f"SELECT DISTINCT werk FROM {table}").collect()["werk"].cast(pl.Utf8).to_list()
+
 
 class UpdateInfos(MySQL_Connector):
     def __init__(self):
         MySQL_Connector.__init__(self)
 
-    def update_df(self, table, df, key_column, batch_size):
+    def update_df(self, table, df, key_column, batch_size=None, retries=3):
         if isinstance(df, pl.LazyFrame):
             df = df.collect()
 
         if key_column not in df.columns:
             raise ValueError(f"A coluna de chave '{key_column}' não existe no DataFrame")
+        mark_write()
+
+        if batch_size is None:
+            tuner = BATCH_TUNERS.get(table, "update", self.connection)
+            return tuner.run(df, lambda batch: self._update_batch(table, batch, key_column), retries)
 
         total_rows = len(df)
         for i in range(0, total_rows, batch_size):
@@ -103,3 +303,84 @@ class UpdateInfos(MySQL_Connector):
             raise
         finally:
             cursor.close()
+
+    def increment_df(self, table, df, key_column, batch_size=None):
+        # SET col = col + delta in one transaction, so writes made meanwhile by others are kept
+        if isinstance(df, pl.LazyFrame):
+            df = df.collect()
+
+        if not table.replace("_", "").isalnum():
+            raise ValueError("Nome de tabela inválido")
+        if key_column not in df.columns:
+            raise ValueError(f"A coluna de chave '{key_column}' não existe no DataFrame")
+        mark_write()
+
+        columns = [col for col in df.columns if col != key_column]
+        set_clause = ", ".join([f"{col} = {col} + %s" for col in columns])
+        sql = f"""
+            UPDATE {table}
+            SET {set_clause}
+            WHERE {key_column} = %s
+        """
+
+        batch_size = batch_size or len(df) or 1
+        cursor = self.connection.cursor()
+        try:
+            for i in range(0, len(df), batch_size):
+                batch = df.slice(i, batch_size)
+                cursor.executemany(sql, [
+                    tuple(row[col] for col in columns) + (row[key_column],)
+                    for row in batch.to_dicts()
+                ])
+            self.connection.commit()
+        except Exception:
+            self.connection.rollback()
+            raise
+        finally:
+            cursor.close()
+        return len(df)
+
+
+class DeleteInfos(MySQL_Connector):
+    def __init__(self):
+        MySQL_Connector.__init__(self)
+
+    def delete_df(self, table, df, key_column, batch_size=None, retries=3, sizes=None):
+        if isinstance(df, pl.LazyFrame):
+            df = df.collect()
+
+        key_columns = [key_column] if isinstance(key_column, str) else list(key_column)
+        for key in key_columns:
+            if key not in df.columns:
+                raise ValueError(f"A coluna de chave '{key}' não existe no DataFrame")
+        mark_write()
+
+        if batch_size is None:
+            tuner = BATCH_TUNERS.get(table, "delete", self.connection)
+            return tuner.run(df, lambda batch: self._delete_batch(table, batch, key_columns), retries, sizes)
+
+        total_rows = len(df)
+        for i in range(0, total_rows, batch_size):
+            batch = df.slice(i, batch_size)
+            self._delete_batch(table, batch, key_columns)
+        if sizes is not None and total_rows:
+            sizes.append(batch_size)
+        return total_rows
+
+    def _delete_batch(self, table, df, key_columns):
+        if not table.replace("_", "").isalnum():
+            raise ValueError("Nome de tabela inválido")
+
+        where_clause = " AND ".join([f"{key} = %s" for key in key_columns])
+        sql = f"DELETE FROM {table} WHERE {where_clause}"
+        values = df.select(key_columns).rows()
+
+        cursor = self.connection.cursor()
+        try:
+            cursor.executemany(sql, values)
+            self.connection.commit()
+        except Exception:
+            self.connection.rollback()
+            raise
+        finally:
+            cursor.close()
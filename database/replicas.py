@@ -0,0 +1,173 @@
+from contextvars import ContextVar
+from itertools import count
+from threading import Lock
+from dotenv import load_dotenv
+from mysql.connector import errors, pooling
+import argparse, json, os, time
+
+load_dotenv("config/.env")
+
+# set by any write in the current request/thread context; reads then stay on the primary
+WROTE_IN_CONTEXT = ContextVar("wrote_in_context", default=False)
+
+
+def mark_write():
+    WROTE_IN_CONTEXT.set(True)
+
+
+class Replica:
+    def __init__(self, index, address):
+        host, _, port = address.strip().partition(":")
+        self.index = index
+        self.host = host
+        self.port = int(port or 3306)
+        self.pool = None
+        self.lag = None
+        self.error = None
+        self.checked_at = 0.0
+        self.checking = Lock()
+
+    @property
+    def name(self):
+        return f"{self.host}:{self.port}"
+
+
+# -- REPLICA ROUTER - READS GO TO A REPLICA WITHIN MAX LAG, EVERYTHING ELSE TO THE PRIMARY --
+class ReplicaRouter:
+    def __init__(self, hosts=None, max_lag: float = None, check_interval: float = None):
+        hosts = hosts if hosts is not None else os.getenv("MYSQL_REPLICA_HOSTS", "")
+        self.replicas = [Replica(i, address) for i, address in enumerate(h for h in hosts.split(",") if h.strip())]
+        self.max_lag = max_lag if max_lag is not None else float(os.getenv("MYSQL_MAX_REPLICA_LAG", "2"))
+        self.check_interval = check_interval if check_interval is not None else float(os.getenv("MYSQL_LAG_CHECK_INTERVAL", "5"))
+        self.user = os.getenv("MYSQL_USER")
+        self.password = os.getenv("MYSQL_PSWD")
+        self.database = os.getenv("MYSQL_DATABASE")
+        self.lock = Lock()
+        self.turn = count()
+        self.routed = {"primary": 0, "replica": 0, "sticky": 0, "pinned": 0, "exhausted": 0, "fallback": 0}
+
+    def _pool(self, replica: Replica):
+        with self.lock:
+            if replica.pool is None:
+                replica.pool = pooling.MySQLConnectionPool(
+                    pool_name=f"alf_replica_{replica.index}",
+                    pool_size=int(os.getenv("MYSQL_POOL_SIZE", "8")),
+                    host=replica.host,
+                    port=replica.port,
+                    user=self.user,
+                    password=self.password,
+                    database=self.database
+                )
+        return replica.pool
+
+    def _replication_lag(self, connection):
+        cursor = connection.cursor(dictionary=True)
+        try:
+            try:
+                cursor.execute("SHOW REPLICA STATUS")
+            except Exception:
+                cursor.execute("SHOW SLAVE STATUS")
+            row = cursor.fetchone()
+        finally:
+            cursor.close()
+        if not row:
+            raise RuntimeError("instância não está replicando")
+        lag = row.get("Seconds_Behind_Source", row.get("Seconds_Behind_Master"))
+        if lag is None:
+            raise RuntimeError("replicação parada")
+        return float(lag)
+
+    def _healthy(self, replica: Replica):
+        return replica.error is None and replica.lag is not None and replica.lag <= self.max_lag
+
+    def check(self, replica: Replica, force: bool = False):
+        if not force and time.monotonic() - replica.checked_at < self.check_interval:
+            return self._healthy(replica)
+
+        # one thread refreshes an expired check, the others go on with the last known state
+        if not replica.checking.acquire(blocking=force):
+            return self._healthy(replica)
+        try:
+            try:
+                connection = self._pool(replica).get_connection()
+            except errors.PoolError:
+                # every connection is busy serving reads, that says nothing about lag or health
+                return self._healthy(replica)
+            try:
+                replica.lag, replica.error = self._replication_lag(connection), None
+            except Exception as e:
+                replica.lag, replica.error = None, str(e)
+            finally:
+                connection.close()
+        except Exception as e:
+            replica.lag, replica.error = None, str(e)
+        finally:
+            replica.checked_at = time.monotonic()
+            replica.checking.release()
+        return self._healthy(replica)
+
+    def mark_failed(self, replica: Replica, error: Exception):
+        replica.error = str(error)
+        replica.checked_at = time.monotonic()
+
+    def count(self, route: str):
+        with self.lock:
+            self.routed[route] += 1
+
+    def choose(self, primary: bool = False):
+        if not self.replicas:
+            return None
+        # process-wide caches are pinned to the primary, a stale load would outlive the lag window
+        if primary:
+            self.count("pinned")
+            return None
+        if WROTE_IN_CONTEXT.get():
+            self.count("sticky")
+            return None
+
+        start = next(self.turn)
+        for offset in range(len(self.replicas)):
+            replica = self.replicas[(start + offset) % len(self.replicas)]
+            if self.check(replica):
+                self.count("replica")
+                return replica
+        self.count("primary")
+        return None
+
+    def connection(self, replica: Replica):
+        return self._pool(replica).get_connection()
+
+    def routed_counts(self):
+        with self.lock:
+            return dict(self.routed)
+
+    def status(self, refresh: bool = False):
+        return {
+            "max_lag_s": self.max_lag,
+            "routed": self.routed_counts(),
+            "replicas": [
+                {
+                    "replica": r.name,
+                    "healthy": self.check(r, force=refresh),
+                    "lag_s": r.lag,
+                    "error": r.error,
+                }
+                for r in self.replicas
+            ],
+        }
+
+
+REPLICAS = ReplicaRouter()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replica routing status")
+    parser.add_argument("--hosts", default=None, help="overrides MYSQL_REPLICA_HOSTS, e.g. 127.0.0.1:3307")
+    args = parser.parse_args()
+
+    router = ReplicaRouter(args.hosts) if args.hosts else REPLICAS
+    print(json.dumps(router.status(refresh=True), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,338 @@
+import argparse, ast
+from pathlib import Path
+from mysql.connector import errors
+from database.connector import MySQL_Connector
+from helpers.data.normalize import WERK_CODE_LENGTH
+
+
+SERVICES_DIR = Path(__file__).resolve().parent.parent / "services"
+
+
+# -- PRIMARY KEYS - USED BY ON DUPLICATE KEY UPDATE AND BY THE WRITE PATHS --
+TABLE_KEYS = {
+    "assembly_line": ["werk", "knr_fx4pd"],
+    "fx4pd": ["werk", "knr_fx4pd", "partnumber"],
+    "pkmc": ["partnumber"],
+    "pk05": ["supply_area"],
+    "forecast": ["werk", "knr_fx4pd", "partnumber"],
+}
+
+PLANT_PARTITIONS = 8
+
+# -- FULL SCANS THAT ARE THE POINT OF THE QUERY (WHOLE-TABLE LOADS), KEYED BY (FILE, TABLE) --
+FULL_SCAN_ALLOWED = {
+    ("services/assembly/differ.py", "assembly_line"): "diff baseline loads the whole line",
+    ("services/consumption/ledger.py", "pkmc"): "ledger recovery loads every balance",
+    ("services/forecast/projection.py", "fx4pd"): "BOM matrix is built from all of fx4pd",
+    ("services/workers/sap/planner.py", "pkmc"): "planner state full load",
+}
+
+
+# -- MIGRATIONS - APPEND ONLY, NEVER EDIT AN APPLIED VERSION --
+MIGRATIONS = [
+    (1, "create alf tables", [
+        """
+        CREATE TABLE IF NOT EXISTS assembly_line (
+            knr_fx4pd       VARCHAR(64) NOT NULL,
+            knr             VARCHAR(32),
+            model           VARCHAR(32),
+            lfdnr_sequence  VARCHAR(32),
+            werk            VARCHAR(8),
+            spj             VARCHAR(8),
+            lane            VARCHAR(32),
+            takt            VARCHAR(16),
+            PRIMARY KEY (knr_fx4pd),
+            KEY idx_assembly_line_lane_seq (lane, lfdnr_sequence),
+            KEY idx_assembly_line_knr_takt (knr_fx4pd, takt)
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS fx4pd (
+            knr_fx4pd   VARCHAR(64) NOT NULL,
+            partnumber  VARCHAR(40) NOT NULL,
+            qty_usage   DOUBLE NOT NULL DEFAULT 0,
+            qty_unit    INT NOT NULL DEFAULT 0,
+            PRIMARY KEY (knr_fx4pd, partnumber),
+            KEY idx_fx4pd_partnumber (partnumber)
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS pkmc (
+            partnumber              VARCHAR(40) NOT NULL,
+            id                      INT,
+            supply_area             VARCHAR(32),
+            num_reg_circ            VARCHAR(32),
+            deposit_type            VARCHAR(8),
+            deposit_position        VARCHAR(32),
+            container               VARCHAR(32),
+            description             VARCHAR(255),
+            pack_standard           VARCHAR(64),
+            qty_per_box             INT,
+            qty_max_box             INT,
+            total_theoretical_qty   INT,
+            qty_for_restock         INT,
+            rack                    VARCHAR(16),
+            lb_balance              INT NOT NULL DEFAULT 0,
+            PRIMARY KEY (partnumber),
+            KEY idx_pkmc_supply_area (supply_area),
+            KEY idx_pkmc_rack (rack)
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS pk05 (
+            supply_area     VARCHAR(32) NOT NULL,
+            id              INT,
+            deposit         VARCHAR(8),
+            responsible     VARCHAR(64),
+            discharge_point VARCHAR(64),
+            description     VARCHAR(255),
+            takt            VARCHAR(16),
+            PRIMARY KEY (supply_area),
+            KEY idx_pk05_takt (takt)
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS forecast (
+            knr_fx4pd               VARCHAR(64) NOT NULL,
+            partnumber              VARCHAR(40) NOT NULL,
+            qty_usage               DOUBLE NOT NULL DEFAULT 0,
+            qty_unit                INT NOT NULL DEFAULT 0,
+            num_reg_circ            VARCHAR(32),
+            takt                    VARCHAR(16),
+            rack                    VARCHAR(16),
+            lb_balance              INT,
+            total_theoretical_qty   INT,
+            qty_for_restock         INT,
+            qty_per_box             INT,
+            qty_max_box             INT,
+            PRIMARY KEY (knr_fx4pd, partnumber),
+            KEY idx_forecast_knr_takt (knr_fx4pd, takt),
+            KEY idx_forecast_partnumber (partnumber)
+        )
+        """,
+    ]),
+    (2, "track pkmc/pk05 row changes for incremental reads", [
+        """
+        ALTER TABLE pkmc
+            ADD COLUMN updated_at TIMESTAMP(3) NOT NULL
+                DEFAULT CURRENT_TIMESTAMP(3) ON UPDATE CURRENT_TIMESTAMP(3),
+            ADD KEY idx_pkmc_updated_at (updated_at)
+        """,
+        """
+        ALTER TABLE pk05
+            ADD COLUMN updated_at TIMESTAMP(3) NOT NULL
+                DEFAULT CURRENT_TIMESTAMP(3) ON UPDATE CURRENT_TIMESTAMP(3),
+            ADD KEY idx_pk05_updated_at (updated_at)
+        """,
+    ]),
+    # partitioned tables need werk in every unique key
+    (3, "partition assembly_line, fx4pd and forecast by werk", [
+        "UPDATE assembly_line SET werk = '' WHERE werk IS NULL",
+        """
+        ALTER TABLE assembly_line
+            MODIFY werk VARCHAR(8) NOT NULL DEFAULT '',
+            DROP PRIMARY KEY,
+            ADD PRIMARY KEY (werk, knr_fx4pd),
+            DROP KEY idx_assembly_line_lane_seq,
+            ADD KEY idx_assembly_line_lane_seq (werk, lane, lfdnr_sequence)
+        """,
+        f"ALTER TABLE assembly_line PARTITION BY KEY (werk) PARTITIONS {PLANT_PARTITIONS}",
+        """
+        ALTER TABLE fx4pd
+            ADD COLUMN werk VARCHAR(8) NOT NULL DEFAULT '' FIRST,
+            DROP PRIMARY KEY,
+            ADD PRIMARY KEY (werk, knr_fx4pd, partnumber)
+        """,
+        f"UPDATE fx4pd SET werk = LEFT(knr_fx4pd, {WERK_CODE_LENGTH})",
+        f"ALTER TABLE fx4pd PARTITION BY KEY (werk) PARTITIONS {PLANT_PARTITIONS}",
+        """
+        ALTER TABLE forecast
+            ADD COLUMN werk VARCHAR(8) NOT NULL DEFAULT '' FIRST,
+            DROP PRIMARY KEY,
+            ADD PRIMARY KEY (werk, knr_fx4pd, partnumber)
+        """,
+        f"UPDATE forecast SET werk = LEFT(knr_fx4pd, {WERK_CODE_LENGTH})",
+        f"ALTER TABLE forecast PARTITION BY KEY (werk) PARTITIONS {PLANT_PARTITIONS}",
+    ]),
+    (4, "track submitted lm01 requests", [
+        """
+        CREATE TABLE IF NOT EXISTS lm01_requests (
+            id              BIGINT NOT NULL AUTO_INCREMENT,
+            partnumber      VARCHAR(40) NOT NULL,
+            num_reg_circ    VARCHAR(32),
+            boxes           INT NOT NULL,
+            requested_at    TIMESTAMP(3) NOT NULL DEFAULT CURRENT_TIMESTAMP(3),
+            status          ENUM('pending', 'done', 'expired') NOT NULL DEFAULT 'pending',
+            updated_at      TIMESTAMP(3) NOT NULL
+                DEFAULT CURRENT_TIMESTAMP(3) ON UPDATE CURRENT_TIMESTAMP(3),
+            PRIMARY KEY (id),
+            KEY idx_lm01_requests_status_part (status, partnumber, requested_at)
+        )
+        """,
+    ]),
+]
+
+
+class SchemaManager(MySQL_Connector):
+    def __init__(self):
+        MySQL_Connector.__init__(self)
+
+    def _ensure_version_table(self):
+        cursor = self.connection.cursor()
+        try:
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS schema_version (
+                    version     INT NOT NULL,
+                    description VARCHAR(255),
+                    applied_at  TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+                    PRIMARY KEY (version)
+                )
+            """)
+            # DDL auto-commits in MySQL, so progress inside a version is tracked per statement
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS schema_version_steps (
+                    version     INT NOT NULL,
+                    step        INT NOT NULL,
+                    applied_at  TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+                    PRIMARY KEY (version, step)
+                )
+            """)
+            self.connection.commit()
+        finally:
+            cursor.close()
+
+    def current_version(self):
+        self._ensure_version_table()
+        cursor = self.connection.cursor()
+        try:
+            cursor.execute("SELECT COALESCE(MAX(version), 0) FROM schema_version")
+            return cursor.fetchone()[0]
+        finally:
+            cursor.close()
+
+    def applied_steps(self, version):
+        cursor = self.connection.cursor()
+        try:
+            cursor.execute("SELECT step FROM schema_version_steps WHERE version = %s", (version,))
+            return {row[0] for row in cursor.fetchall()}
+        finally:
+            cursor.close()
+
+    def migrate(self, target=None):
+        current = self.current_version()
+        applied = []
+
+        for version, description, statements in MIGRATIONS:
+            if version <= current or (target is not None and version > target):
+                continue
+
+            done = self.applied_steps(version)
+            cursor = self.connection.cursor()
+            try:
+                # a failed run resumes at the first statement that did not complete
+                for step, statement in enumerate(statements):
+                    if step in done:
+                        continue
+                    cursor.execute(statement)
+                    cursor.execute(
+                        "INSERT INTO schema_version_steps (version, step) VALUES (%s, %s)",
+                        (version, step)
+                    )
+                    self.connection.commit()
+                cursor.execute(
+                    "INSERT INTO schema_version (version, description) VALUES (%s, %s)",
+                    (version, description)
+                )
+                self.connection.commit()
+            except Exception:
+                self.connection.rollback()
+                raise
+            finally:
+                cursor.close()
+
+            applied.append(version)
+        return applied
+
+
+class QueryPlanChecker(MySQL_Connector):
+    def __init__(self, services_dir: Path = SERVICES_DIR):
+        MySQL_Connector.__init__(self)
+        self.services_dir = services_dir
+
+    def collect_queries(self):
+        queries = []
+        for path in sorted(self.services_dir.rglob("*.py")):
+            tree = ast.parse(path.read_text(encoding="utf-8"))
+            for node in ast.walk(tree):
+                if isinstance(node, ast.Constant) and isinstance(node.value, str):
+                    sql = " ".join(node.value.split())
+                    if sql.upper().startswith("SELECT "):
+                        queries.append((f"{path.relative_to(self.services_dir.parent)}:{node.lineno}", sql, None))
+        return queries + self.built_queries()
+
+    def built_queries(self):
+        # queries assembled by SelectQuery never appear as a literal, check the paged endpoint shapes
+        from services.forecast.forecaster import DefineForecastValues
+        from services.forecast.buff_al import ReturnBuffAssemblyLineValues
+        return [
+            ("DefineForecastValues.forecast_query", *DefineForecastValues.forecast_query(limit=1).build()),
+            ("ReturnBuffAssemblyLineValues.reception_query", *ReturnBuffAssemblyLineValues.reception_query(limit=1).build()),
+        ]
+
+    def explain(self, sql, params=None):
+        cursor = self.connection.cursor(dictionary=True)
+        try:
+            # literals have no values to bind, NULL keeps their placeholders valid SQL
+            sql = sql.rstrip(";")
+            if params is None:
+                cursor.execute("EXPLAIN " + sql.replace("%s", "NULL"))
+            else:
+                cursor.execute("EXPLAIN " + sql, params)
+            return cursor.fetchall()
+        finally:
+            cursor.close()
+
+    def check(self):
+        report = []
+        for origin, sql, params in self.collect_queries():
+            source = origin.rsplit(":", 1)[0]
+            # one statement MySQL rejects is reported, the others are still checked
+            try:
+                plan = self.explain(sql, params)
+            except errors.Error as e:
+                report.append({"origin": origin, "sql": sql, "full_scans": [], "allowed_scans": [], "error": str(e)})
+                continue
+            scans = [row["table"] for row in plan if row.get("type") == "ALL"]
+            allowed = [table for table in scans if (source, table) in FULL_SCAN_ALLOWED]
+            full_scans = [table for table in scans if table not in allowed]
+            report.append({"origin": origin, "sql": sql, "full_scans": full_scans, "allowed_scans": allowed, "error": None})
+        return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="ALF schema management")
+    parser.add_argument("command", choices=["version", "migrate", "check"])
+    parser.add_argument("--target", type=int, default=None)
+    args = parser.parse_args()
+
+    if args.command == "version":
+        print(SchemaManager().current_version())
+    elif args.command == "migrate":
+        applied = SchemaManager().migrate(args.target)
+        print(f"applied versions: {applied}" if applied else "schema already up to date")
+    else:
+        report = QueryPlanChecker().check()
+        flagged = [r for r in report if r["full_scans"] or r["error"]]
+        for r in report:
+            if r["error"]:
+                status = f"EXPLAIN FAILED: {r['error']}"
+            elif r["full_scans"]:
+                status = f"FULL SCAN on {', '.join(r['full_scans'])}"
+            else:
+                status = f"ok, allowed full scan on {', '.join(r['allowed_scans'])}" if r["allowed_scans"] else "ok"
+            print(f"[{status}] {r['origin']}\n    {r['sql']}")
+        raise SystemExit(1 if flagged else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+from concurrent.futures import Future
+from threading import Condition, Lock, Thread
+from database.queries import UpsertInfos
+from database.replicas import mark_write
+from database.schema import TABLE_KEYS
+import polars as pl, time
+
+
+class TableWriteQueue:
+    def __init__(self, table, keys, max_rows: int = 20_000, max_delay: float = 0.5, batch_size: int = None):
+        self.table = table
+        self.keys = keys
+        self.max_rows = max_rows
+        self.max_delay = max_delay
+        self.batch_size = batch_size
+
+        self.pending = []
+        self.rows = 0
+        self.oldest = None
+        self.condition = Condition()
+        self.thread = Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def submit(self, df, batch_size: int = None) -> Future:
+        if isinstance(df, pl.LazyFrame):
+            df = df.collect()
+
+        missing = [key for key in self.keys if key not in df.columns]
+        if missing:
+            raise ValueError(f"Colunas de chave ausentes para '{self.table}': {missing}")
+
+        # the flush runs on the queue thread, stickiness belongs to the submitting request
+        mark_write()
+        future = Future()
+        with self.condition:
+            self.pending.append((df, batch_size, future))
+            self.rows += len(df)
+            if self.oldest is None:
+                self.oldest = time.monotonic()
+            self.condition.notify()
+        return future
+
+    def _due(self):
+        if not self.pending:
+            return False
+        return self.rows >= self.max_rows or time.monotonic() - self.oldest >= self.max_delay
+
+    def _run(self):
+        while True:
+            with self.condition:
+                while not self._due():
+                    timeout = None if not self.pending else max(0.0, self.max_delay - (time.monotonic() - self.oldest))
+                    self.condition.wait(timeout)
+                pending, self.pending = self.pending, []
+                self.rows, self.oldest = 0, None
+            self._flush(pending)
+
+    def _merge(self, frames):
+        # consecutive frames with the same column set share one INSERT; a change of
+        # columns starts a new run, so runs are written in submission order and the
+        # latest submission of a key always lands last
+        runs = []
+        for df in frames:
+            if runs and runs[-1][0].columns == df.columns:
+                runs[-1].append(df)
+            else:
+                runs.append([df])
+
+        return [
+            pl.concat(run, how="vertical_relaxed")
+                .unique(subset=self.keys, keep="last", maintain_order=True)
+            for run in runs
+        ]
+
+    def _batch_size(self, sizes):
+        # the smallest size a caller asked for holds for the whole merged write
+        sizes = [size for size in sizes if size]
+        return min(sizes) if sizes else self.batch_size
+
+    def _write(self, frames, batch_size):
+        rows, sizes = UpsertInfos().upsert_transaction(self.table, self._merge(frames), batch_size)
+        return {
+            "table": self.table,
+            "rows": rows,
+            "submissions": len(frames),
+            "batch_sizes": sizes,
+        }
+
+    def _flush(self, pending):
+        try:
+            result = self._write([df for df, _, _ in pending], self._batch_size([size for _, size, _ in pending]))
+        except Exception as e:
+            if len(pending) == 1:
+                pending[0][2].set_exception(e)
+                return
+            # one bad submission must not fail the others, so each is retried on its own
+            for df, size, future in pending:
+                try:
+                    future.set_result(self._write([df], self._batch_size([size])))
+                except Exception as e:
+                    future.set_exception(e)
+            return
+
+        for _, _, future in pending:
+            future.set_result(result)
+
+
+class WriteQueues:
+    def __init__(self, **options):
+        self.options = options
+        self.queues = {}
+        self.lock = Lock()
+
+    def get(self, table) -> TableWriteQueue:
+        with self.lock:
+            if table not in self.queues:
+                if table not in TABLE_KEYS:
+                    raise ValueError(f"Tabela sem chave primária registrada: {table}")
+                self.queues[table] = TableWriteQueue(table, TABLE_KEYS[table], **self.options)
+            return self.queues[table]
+
+    def submit(self, table, df, batch_size: int = None) -> Future:
+        return self.get(table).submit(df, batch_size)
+
+
+WRITE_QUEUES = WriteQueues()
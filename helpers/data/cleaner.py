@@ -1,4 +1,5 @@
 from .loader import DataLoader
+from .registry import SchemaRegistry
 from pathlib import Path
 from dotenv import load_dotenv
 import polars as pl, os
@@ -16,10 +17,10 @@ class CleanerBase:
     def _get_path(self, env_key: str) -> Path:
         return Path(self._resolve_path(os.getenv(env_key)))
 
-    def _load_file(self, env_key):
+    def _load_file(self, env_key, columns=None, sheet_name=None):
         path = self._get_path(env_key)
-        data_map = DataLoader(path).load_data()
+        data_map = DataLoader(path, columns=columns, sheet_name=sheet_name).load_data()
         return data_map[path]
 
     def _rename(self, df: pl.DataFrame, rename_map: dict) -> pl.DataFrame:
-        return df.select(list(rename_map.keys())).rename(rename_map)
\ No newline at end of file
+        return SchemaRegistry.strings(df.select(list(rename_map.keys())).rename(rename_map))
\ No newline at end of file
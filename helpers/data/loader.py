@@ -1,25 +1,76 @@
-import polars as pl
-from typing import Union, List
+import polars as pl, os
+from typing import Union, List, Optional
+
+EXCEL_EXTENSIONS = [".xlsx", ".xls", ".xlsm", ".XLSX"]
+HEADER_SCAN_ROWS = 20
+
+# (path, mtime, size, sheet, columns) -> header row, an unchanged workbook is only previewed once
+HEADER_ROWS = {}
 
 
 class DataLoader:
-    def __init__(self, file_paths: Union[str, List[str]]):
+    def __init__(
+        self,
+        file_paths: Union[str, List[str]],
+        columns: Optional[List[Union[str, int]]] = None,
+        sheet_name: Optional[str] = None,
+    ):
         self.file_paths = [file_paths]
+        self.columns = columns
+        self.sheet_name = sheet_name
 
     def define_ext_file(self, file_path: str) -> str:
         return file_path.suffix
 
+    def detect_header_row(self, file_path) -> int:
+        # positional selections have no names to look for, the header is the first row
+        if not self.columns or not all(isinstance(col, str) for col in self.columns):
+            return 0
+
+        st = os.stat(file_path)
+        key = (str(file_path), st.st_mtime_ns, st.st_size, self.sheet_name, tuple(self.columns))
+        if key not in HEADER_ROWS:
+            HEADER_ROWS[key] = self._scan_header_row(file_path)
+        return HEADER_ROWS[key]
+
+    def _scan_header_row(self, file_path) -> int:
+        # everything as text: the preview mixes titles, header and data, so dtype inference only warns
+        preview = pl.read_excel(
+            file_path,
+            engine="calamine",
+            sheet_name=self.sheet_name,
+            read_options={"header_row": None, "n_rows": HEADER_SCAN_ROWS, "dtypes": "string"},
+            raise_if_empty=False,
+        )
+        required = set(self.columns)
+        for i, row in enumerate(preview.iter_rows()):
+            if required <= {str(value).strip() for value in row if value is not None}:
+                return i
+        return 0
+
+    def read_excel_projected(self, file_path) -> pl.DataFrame:
+        return pl.read_excel(
+            file_path,
+            engine="calamine",
+            sheet_name=self.sheet_name,
+            columns=self.columns,
+            read_options={"header_row": self.detect_header_row(file_path)},
+            raise_if_empty=False,
+        )
+
     def load_data(self):
         loaded_data = {}
 
         for file_path in self.file_paths:
             ext = self.define_ext_file(file_path)
 
-            if ext in [".xlsx", ".xls", ".xlsm", ".XLSX"]:
+            if ext in EXCEL_EXTENSIONS and self.columns is not None:
+                df = self.read_excel_projected(file_path)
+            elif ext in EXCEL_EXTENSIONS:
                 df = pl.read_excel(
                     file_path,
                     raise_if_empty=False,
-                    read_csv_options={"infer_schema_length": 10000}
+                    infer_schema_length=10000,
                 )
             elif ext == ".parquet":
                 df = pl.scan_parquet(file_path).collect()
@@ -33,4 +84,4 @@ class DataLoader:
 
             loaded_data[file_path] = df
 
-        return loaded_data
\ No newline at end of file
+        return loaded_data
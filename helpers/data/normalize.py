@@ -0,0 +1,52 @@
+from dotenv import load_dotenv
+import polars as pl, os
+
+load_dotenv("config/.env")
+
+# knr_fx4pd is built as werk + spj + knr, the plant code is its fixed-width prefix
+WERK_CODE_LENGTH = int(os.getenv("WERK_CODE_LENGTH", "2"))
+
+# one regex per column: each pattern below replaces a chain of passes in the cleaners
+NOT_PARTNUMBER_CHARS = r"[^\w-]"
+NON_DIGITS = r"\D+"
+TAKT = r"(T\d+)"
+RACK = r"(P\d+[A-Z]?)"
+
+
+class Normalize:
+    @staticmethod
+    def partnumber(column: str = "partnumber") -> pl.Expr:
+        return (
+            pl.col(column)
+            .cast(pl.Utf8)
+            .str.replace_all(NOT_PARTNUMBER_CHARS, "")
+            .str.to_uppercase()
+            .alias(column)
+        )
+
+    @staticmethod
+    def digits(column: str, dtype=pl.Int64, default=0) -> pl.Expr:
+        return (
+            pl.col(column)
+            .cast(pl.Utf8)
+            .str.replace_all(NON_DIGITS, "")
+            .cast(dtype, strict=False)
+            .fill_null(default)
+            .alias(column)
+        )
+
+    @staticmethod
+    def no_spaces(expr: pl.Expr) -> pl.Expr:
+        return expr.str.replace_all(" ", "", literal=True)
+
+    @staticmethod
+    def werk(column: str = "knr_fx4pd") -> pl.Expr:
+        return pl.col(column).cast(pl.Utf8).str.slice(0, WERK_CODE_LENGTH).alias("werk")
+
+    @staticmethod
+    def takt(column: str = "description") -> pl.Expr:
+        return pl.col(column).cast(pl.Utf8).str.extract(TAKT, 1).alias("takt")
+
+    @staticmethod
+    def rack(column: str = "supply_area") -> pl.Expr:
+        return pl.col(column).cast(pl.Utf8).str.extract(RACK, 1).alias("rack")
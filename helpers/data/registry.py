@@ -0,0 +1,59 @@
+import polars as pl
+
+
+# categorical codes are only comparable across frames under one global cache
+pl.enable_string_cache()
+
+CATEGORICAL = pl.Categorical(ordering="lexical")
+
+
+CATEGORICAL_COLUMNS = ["partnumber", "rack", "takt", "supply_area", "lane", "model", "werk"]
+
+COLUMN_TYPES = {
+    # -- KEYS AND IDENTIFIERS --
+    "knr_fx4pd": pl.Utf8,
+    "knr": pl.Utf8,
+    "spj": pl.Utf8,
+    "lfdnr_sequence": pl.Utf8,
+    "num_reg_circ": pl.Utf8,
+    "id": pl.UInt32,
+
+    # -- MASTER DATA --
+    "deposit": pl.Utf8,
+    "deposit_type": pl.Utf8,
+    "deposit_position": pl.Utf8,
+    "responsible": pl.Utf8,
+    "discharge_point": pl.Utf8,
+    "description": pl.Utf8,
+    "container": pl.Utf8,
+    "pack_standard": pl.Utf8,
+
+    # -- QUANTITIES --
+    "qty_usage": pl.Float64,
+    "qty_unit": pl.Int32,
+    "qty_per_box": pl.Int64,
+    "qty_max_box": pl.Int64,
+    "total_theoretical_qty": pl.Int64,
+    "qty_for_restock": pl.Int64,
+    "lb_balance": pl.Int64,
+}
+
+
+class SchemaRegistry:
+    @staticmethod
+    def strings(df):
+        # raw master data: only pin text columns, numeric ones still go through the cleaners
+        columns = df.columns
+        return df.with_columns([
+            pl.col(col).cast(pl.Utf8)
+            for col in columns
+            if col in CATEGORICAL_COLUMNS or COLUMN_TYPES.get(col) == pl.Utf8
+        ])
+
+    @staticmethod
+    def apply(df):
+        columns = df.columns
+        return df.with_columns(
+            [pl.col(col).cast(dtype, strict=False) for col, dtype in COLUMN_TYPES.items() if col in columns] +
+            [pl.col(col).cast(pl.Utf8).cast(CATEGORICAL) for col in CATEGORICAL_COLUMNS if col in columns]
+        )
@@ -1,15 +1,21 @@
 from services.assembly.assembly_api import AccessAssemblyLineApi
 from services.assembly.processor import DefineDataFrame, TransformDataFrame
+from services.assembly.differ import AssemblyDeltaSync, DELTA_SYNC
+from services.assembly.history import SnapshotHistory, HISTORY
 from database.queries import UpsertInfos
 
 
 class BuildPipeline:
+    @staticmethod
     def build_assembly(api: AccessAssemblyLineApi):
-        raw = api.get_raw_response()
-        df = DefineDataFrame(raw).extract_car_records()
+        return BuildPipeline.transform_assembly(api.get_raw_response())
+
+    @staticmethod
+    def transform_assembly(raw: dict):
+        df = DefineDataFrame(raw).extract_car_records().lazy()
         df = TransformDataFrame(df).transform()
-        df = TransformDataFrame(df).attach_fx4pd()
-        return df.collect()
+        df = TransformDataFrame(df).attach_fx4pd().collect()
+        return df
     
 
 class DependeciesInjection:
@@ -19,4 +25,12 @@ class DependeciesInjection:
 
     @staticmethod
     def get_upsert() -> UpsertInfos:
-        return UpsertInfos()
\ No newline at end of file
+        return UpsertInfos()
+
+    @staticmethod
+    def get_delta_sync() -> AssemblyDeltaSync:
+        return DELTA_SYNC
+
+    @staticmethod
+    def get_history() -> SnapshotHistory:
+        return HISTORY
@@ -1,8 +1,11 @@
 from services.forecast.fx4pd import ReturnFX4PDValues
+from helpers.data.registry import SchemaRegistry
 from database.queries import UpsertInfos
+from database.write_queue import WRITE_QUEUES, WriteQueues
 from services.forecast.buff_al import ReturnBuffAssemblyLineValues
 from services.forecast.fx4pd import ReturnFX4PDValues
 from services.forecast.forecaster import DefineForecastValues
+from services.forecast.projection import ConsumptionProjection, PROJECTION
 
 
 class BuildPipeline:
@@ -11,7 +14,13 @@ class BuildPipeline:
         df = svc.create_fx4pd_df()
         df = svc.rename_select_columns(df)
         df = svc.clean_column(df)
-        return df
+        return SchemaRegistry.apply(df)
+
+    @staticmethod
+    def build_plant_forecast(werk, batch_size=None):
+        df = DefineForecastValues().join_fx4pd_pkmc_pk05(werk).collect()
+        WRITE_QUEUES.submit("forecast", df, batch_size).result()
+        return len(df)
     
 
 class DependenciesInjection:
@@ -27,6 +36,14 @@ class DependenciesInjection:
     def get_forecast_service() -> DefineForecastValues:
         return DefineForecastValues()
 
+    @staticmethod
+    def get_projection_service() -> ConsumptionProjection:
+        return PROJECTION
+
     @staticmethod
     def get_upsert_service() -> UpsertInfos:
-        return UpsertInfos()
\ No newline at end of file
+        return UpsertInfos()
+
+    @staticmethod
+    def get_write_queues() -> WriteQueues:
+        return WRITE_QUEUES
@@ -0,0 +1,87 @@
+from collections import OrderedDict
+from threading import Lock
+from fastapi import Request
+from fastapi.responses import Response
+import gzip, polars as pl, zlib
+
+
+GZIP_MINIMUM_SIZE = 1000
+
+
+def frame_to_json(df: pl.DataFrame, orient: str = "rows") -> bytes:
+    df = df.with_columns(pl.col(pl.Categorical).cast(pl.Utf8))
+    if orient == "columns":
+        # one row of list columns -> {"col": [...], ...} from the same native writer
+        return _write_rows(df.select(pl.all().implode()))[1:-1]
+    return _write_rows(df)
+
+
+def _write_rows(df: pl.DataFrame) -> bytes:
+    try:
+        return df.write_json(row_oriented=True).encode()
+    except TypeError:
+        return df.write_json().encode()
+
+
+# -- RESPONSE CACHE - SERIALISED + GZIPPED BYTES, REUSED WHILE THE FRAME IS UNCHANGED --
+class FrameResponseCache:
+    def __init__(self, max_entries: int = 64):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.lock = Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def fingerprint(df: pl.DataFrame, orient: str) -> str:
+        # the row position is hashed with each row, so the same rows in another order differ
+        rows = int(df.with_row_index("__fingerprint_row").hash_rows(seed=0).sum()) if len(df) else 0
+        columns = zlib.crc32(",".join(df.columns).encode())
+        return f"{orient}-{df.shape[0]}x{df.shape[1]}-{columns:x}-{rows & 0xffffffffffffffff:x}"
+
+    def get(self, key, df: pl.DataFrame, orient: str):
+        tag = self.fingerprint(df, orient)
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry and entry[0] == tag:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return entry
+
+        body = frame_to_json(df, orient)
+        entry = (tag, body, gzip.compress(body, compresslevel=6) if len(body) >= GZIP_MINIMUM_SIZE else None)
+        with self.lock:
+            self.misses += 1
+            self.entries[key] = entry
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+        return entry
+
+
+RESPONSE_CACHE = FrameResponseCache()
+
+
+class FrameJSONResponse(Response):
+    media_type = "application/json"
+
+    def __init__(self, content: pl.DataFrame, orient: str = "rows", status_code: int = 200, headers=None):
+        self.orient = orient
+        Response.__init__(self, content, status_code, headers)
+
+    def render(self, content) -> bytes:
+        if isinstance(content, bytes):
+            return content
+        return frame_to_json(content, self.orient)
+
+    @classmethod
+    def cached(cls, df: pl.DataFrame, request: Request, orient: str = "rows", cache: FrameResponseCache = RESPONSE_CACHE):
+        tag, body, compressed = cache.get(str(request.url), df, orient)
+        headers = {"ETag": f'"{tag}"', "Vary": "Accept-Encoding"}
+
+        if request.headers.get("if-none-match") == headers["ETag"]:
+            return Response(status_code=304, headers=headers)
+        # GZipMiddleware leaves responses that already carry Content-Encoding alone
+        if compressed is not None and "gzip" in request.headers.get("accept-encoding", ""):
+            return cls(compressed, orient, headers={**headers, "Content-Encoding": "gzip"})
+        return cls(body, orient, headers=headers)
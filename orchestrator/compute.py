@@ -0,0 +1,90 @@
+from collections import deque
+from concurrent.futures import Future
+from contextvars import copy_context
+from threading import Condition, Thread, local
+import heapq, itertools, os, time
+
+# polars reads POLARS_MAX_THREADS once, at import - this module must be imported before it
+COMPUTE_SLOTS = max(1, int(os.getenv("COMPUTE_SLOTS", "2")))
+os.environ.setdefault("POLARS_MAX_THREADS", str(max(1, (os.cpu_count() or 1) // COMPUTE_SLOTS)))
+
+API = 0
+PIPELINE = 1
+PRIORITY_NAMES = {API: "api", PIPELINE: "pipeline"}
+
+
+# -- COMPUTE EXECUTOR - CAPS CONCURRENT DATAFRAME JOBS, API BEFORE PIPELINES --
+class ComputeExecutor:
+    def __init__(self, slots: int = COMPUTE_SLOTS, history: int = 1000):
+        self.slots = slots
+        self.jobs = []
+        self.sequence = itertools.count()
+        self.condition = Condition()
+        self.running = 0
+        self.waits = {priority: deque(maxlen=history) for priority in PRIORITY_NAMES}
+        self.completed = {priority: 0 for priority in PRIORITY_NAMES}
+        self.context = local()
+        self.threads = [Thread(target=self._work, daemon=True) for _ in range(slots)]
+        for thread in self.threads:
+            thread.start()
+
+    def submit(self, fn, *args, priority: int = API, **kwargs) -> Future:
+        future = Future()
+        # the job runs in the caller's context, so per-request state (e.g. read-your-writes) follows it
+        call = copy_context().run
+        with self.condition:
+            heapq.heappush(self.jobs, (priority, next(self.sequence), time.perf_counter(), future, call, (fn, *args), kwargs))
+            self.condition.notify()
+        return future
+
+    def run(self, fn, *args, priority: int = API, **kwargs):
+        # a job already holding a slot runs nested work inline instead of waiting on itself
+        if getattr(self.context, "busy", False):
+            return fn(*args, **kwargs)
+        return self.submit(fn, *args, priority=priority, **kwargs).result()
+
+    def _work(self):
+        self.context.busy = True
+        while True:
+            with self.condition:
+                while not self.jobs:
+                    self.condition.wait()
+                priority, _, queued_at, future, fn, args, kwargs = heapq.heappop(self.jobs)
+                self.running += 1
+                self.waits[priority].append(time.perf_counter() - queued_at)
+
+            if future.set_running_or_notify_cancel():
+                try:
+                    future.set_result(fn(*args, **kwargs))
+                except BaseException as e:
+                    future.set_exception(e)
+
+            with self.condition:
+                self.running -= 1
+                self.completed[priority] += 1
+
+    def stats(self):
+        with self.condition:
+            queued = {name: 0 for name in PRIORITY_NAMES.values()}
+            for job in self.jobs:
+                queued[PRIORITY_NAMES[job[0]]] += 1
+
+            report = {
+                "slots": self.slots,
+                "polars_threads": int(os.environ["POLARS_MAX_THREADS"]),
+                "running": self.running,
+                "queued": queued,
+                "wait_ms": {},
+            }
+            for priority, name in PRIORITY_NAMES.items():
+                waits = sorted(self.waits[priority])
+                report["wait_ms"][name] = {
+                    "completed": self.completed[priority],
+                    "p50": waits[len(waits) // 2] * 1000 if waits else 0.0,
+                    "p95": waits[int(len(waits) * 0.95)] * 1000 if waits else 0.0,
+                    "max": waits[-1] * 1000 if waits else 0.0,
+                }
+        return report
+
+
+COMPUTE = ComputeExecutor()
@@ -0,0 +1,76 @@
+from pathlib import Path
+from queue import Queue
+from threading import Lock, Thread
+from helpers.data.cleaner import CleanerBase
+from orchestrator.pipeline_registry import PIPELINES, PIPELINE_SOURCES
+
+
+def pipeline_sources():
+    resolver = CleanerBase()
+    return {name: resolver._get_path(env_key) for name, env_key in PIPELINE_SOURCES.items()}
+
+
+def pipeline_for_file(path):
+    # the full resolved path has to match, a file of the same name elsewhere is not a source
+    path = Path(path).resolve()
+    for name, source in pipeline_sources().items():
+        if source.resolve() == path:
+            return name
+    return None
+
+
+# -- INGESTION - ONE PIPELINE RUN AT A TIME, A NAME IS NEVER QUEUED TWICE --
+class IngestionQueue:
+    def __init__(self, pipelines=None):
+        self.pipelines = PIPELINES if pipelines is None else pipelines
+        self.queue = Queue()
+        self.pending = set()
+        self.signatures = {}
+        self.queued_signatures = {}
+        self.running = {}
+        self.lock = Lock()
+        self.last_results = {}
+        self.thread = Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def enqueue(self, name, signature=None):
+        if name not in self.pipelines:
+            raise KeyError(f"pipeline {name} not registered")
+
+        with self.lock:
+            if signature is not None and self.signatures.get(name) == signature:
+                return {"status": f"service {name} already ingested this file"}
+            # an upload also wakes the watcher, its event for the same file lands while the run is in flight
+            if signature is not None and self.running.get(name) == signature:
+                return {"status": f"service {name} already ingesting this file"}
+            # the signature only counts as ingested once the run succeeds, a failed run can be retried
+            self.queued_signatures[name] = signature
+            if name in self.pending:
+                return {"status": f"service {name} already queued"}
+            self.pending.add(name)
+        self.queue.put(name)
+        return {"status": f"service {name} queued"}
+
+    def _run(self):
+        while True:
+            name = self.queue.get()
+            with self.lock:
+                self.pending.discard(name)
+                signature = self.queued_signatures.pop(name, None)
+                self.running[name] = signature
+            try:
+                # pipelines take a compute slot for their transforms only
+                self.pipelines[name]()
+                self.last_results[name] = "success"
+                if signature is not None:
+                    with self.lock:
+                        self.signatures[name] = signature
+            except Exception as e:
+                self.last_results[name] = f"failed: {e}"
+            finally:
+                # on failure the signature is forgotten, so the same file can be ingested again
+                with self.lock:
+                    self.running.pop(name, None)
+
+
+INGESTION = IngestionQueue()
@@ -6,12 +6,11 @@ from orchestrator.workers_registry import WORKERS
 # -- PIPELINES - WILL RUN ONLY WHEN CALLED --
 class PipelinesOrchestrator:
     def run_pipeline(self, name):
-        PIPELINES[name]() 
+        PIPELINES[name]()
         return {"status": f"service {name} executed successfully (sync)"}
 
     def run_pipeline_async(self, name):
-        thread = Thread(target=PIPELINES[name], daemon=True)
-        thread.start()
+        Thread(target=PIPELINES[name], daemon=True).start()
         return {"status": f"service {name} executed successfully (async)"}
     
 
@@ -1,8 +1,17 @@
 from services.pipelines.pkmc.pipeline import pkmc_pipeline
 from services.pipelines.pk05.pipeline import pk05_pipeline
+from services.pipelines.fx4pd.pipeline import fx4pd_pipeline
 
 
 PIPELINES = {
     "pkmc": pkmc_pipeline,
     "pk05": pk05_pipeline,
-}
\ No newline at end of file
+    "fx4pd": fx4pd_pipeline,
+}
+
+# -- ENV KEY OF THE SOURCE FILE READ BY EACH PIPELINE --
+PIPELINE_SOURCES = {
+    "pkmc": "PKMC_PATH",
+    "pk05": "PK05_PATH",
+    "fx4pd": "FX4PD_PATH",
+}
@@ -0,0 +1,112 @@
+from threading import Event, Thread
+from orchestrator.ingestion import INGESTION, pipeline_sources
+import hashlib, logging, os, time
+
+try:
+    from inotify_simple import INotify, flags
+except ImportError:
+    INotify = None
+
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 1024 * 1024
+
+
+# -- WATCHER - RUNS ONLY THE PIPELINE WHOSE SOURCE FILE CHANGED --
+class SourceWatcher:
+    def __init__(self, debounce: float = 2.0, poll_interval: float = 1.0, queue=INGESTION):
+        self.debounce = debounce
+        self.poll_interval = poll_interval
+        self.queue = queue
+        self.sources = {path: name for name, path in pipeline_sources().items()}
+        self.signatures = {path: self._stat(path) for path in self.sources}
+        self.dirty = {}
+        self.stop_event = Event()
+        self.thread = None
+
+    def _stat(self, path):
+        try:
+            st = os.stat(path)
+            return (st.st_size, st.st_mtime_ns)
+        except FileNotFoundError:
+            return None
+
+    def _sha256(self, path):
+        digest = hashlib.sha256()
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    def _mark(self, path):
+        self.dirty[path] = (time.monotonic(), self._stat(path))
+
+    def _poll_changes(self):
+        for path in self.sources:
+            signature = self._stat(path)
+            if signature != self.signatures[path]:
+                self.signatures[path] = signature
+                self._mark(path)
+
+    def _settle(self):
+        now = time.monotonic()
+        for path, (marked_at, signature) in list(self.dirty.items()):
+            if now - marked_at < self.debounce:
+                continue
+
+            current = self._stat(path)
+            if current is None:
+                del self.dirty[path]
+                continue
+            if current != signature:
+                # still being written, wait for another quiet period
+                self._mark(path)
+                continue
+
+            self.queue.enqueue(self.sources[path], self._sha256(path))
+            del self.dirty[path]
+
+    def _run_polling(self):
+        while not self.stop_event.wait(self.poll_interval):
+            try:
+                self._poll_changes()
+                self._settle()
+            except Exception:
+                # one bad read must not end the watch, the next poll retries
+                logger.exception("source watcher poll failed")
+
+    def _run_inotify(self):
+        inotify = INotify()
+        mask = flags.CLOSE_WRITE | flags.MOVED_TO | flags.CREATE | flags.MODIFY
+        directories = {}
+        for path in self.sources:
+            if path.parent.exists() and path.parent not in directories.values():
+                directories[inotify.add_watch(str(path.parent), mask)] = path.parent
+
+        while not self.stop_event.is_set():
+            try:
+                for event in inotify.read(timeout=int(self.poll_interval * 1000)):
+                    if event.wd not in directories:
+                        continue
+                    path = directories[event.wd] / event.name
+                    if path in self.sources:
+                        self._mark(path)
+                self._settle()
+            except Exception:
+                logger.exception("source watcher event handling failed")
+                self.stop_event.wait(self.poll_interval)
+        inotify.close()
+
+    def start(self):
+        if self.thread and self.thread.is_alive():
+            return
+        self.stop_event.clear()
+        target = self._run_inotify if INotify is not None else self._run_polling
+        self.thread = Thread(target=target, daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.stop_event.set()
+        if self.thread:
+            self.thread.join()
@@ -0,0 +1,139 @@
+from collections import deque
+from datetime import datetime
+from threading import Lock
+from database.queries import SelectInfos, DeleteInfos
+from database.write_queue import WRITE_QUEUES
+from database.schema import TABLE_KEYS
+import polars as pl
+
+
+KEY = "knr_fx4pd"
+MOVE_COLUMNS = ["lane", "takt"]
+
+
+class SnapshotDiffer:
+    def __init__(self):
+        self.previous = None
+        self.lock = Lock()
+
+    def _align(self, previous: pl.DataFrame, current: pl.DataFrame) -> pl.DataFrame:
+        return previous.select([
+            pl.col(col).cast(current.schema[col], strict=False)
+            if col in previous.columns else pl.lit(None, dtype=current.schema[col]).alias(col)
+            for col in current.columns
+        ])
+
+    def commit(self, current: pl.DataFrame, werk=None):
+        # a plant-scoped snapshot only replaces that plant's rows, the others stay as they were
+        with self.lock:
+            if werk is None or self.previous is None:
+                self.previous = current
+            else:
+                self.previous = pl.concat(
+                    [self.previous.filter(pl.col("werk").cast(pl.Utf8).ne_missing(str(werk))), current],
+                    how="diagonal_relaxed",
+                )
+
+    def diff(self, current: pl.DataFrame, werk=None) -> pl.DataFrame:
+        with self.lock:
+            previous = self.previous
+
+        if previous is None:
+            previous = current.clear()
+        elif werk is not None:
+            previous = previous.filter(pl.col("werk").cast(pl.Utf8) == str(werk))
+        previous = self._align(previous, current)
+
+        prev_moves = previous.select([KEY] + [pl.col(c).alias(f"prev_{c}") for c in MOVE_COLUMNS])
+        empty_moves = [pl.lit(None, dtype=current.schema[c]).alias(f"prev_{c}") for c in MOVE_COLUMNS]
+
+        entered = (
+            current.join(previous.select(KEY), on=KEY, how="anti")
+            .with_columns(empty_moves)
+            .with_columns(pl.lit("entered").alias("event"))
+        )
+        moved = (
+            current.join(prev_moves, on=KEY, how="inner")
+            .filter(pl.any_horizontal([
+                pl.col(c).ne_missing(pl.col(f"prev_{c}")) for c in MOVE_COLUMNS
+            ]))
+            .with_columns(pl.lit("moved").alias("event"))
+        )
+        exited = (
+            previous.join(current.select(KEY), on=KEY, how="anti")
+            .with_columns([pl.col(c).alias(f"prev_{c}") for c in MOVE_COLUMNS])
+            .with_columns(pl.lit("exited").alias("event"))
+        )
+
+        return pl.concat([entered, moved, exited], how="vertical_relaxed")
+
+
+class AssemblyEventLog:
+    def __init__(self, max_batches: int = 1000):
+        self.batches = deque(maxlen=max_batches)
+        self.sequence = 0
+        self.lock = Lock()
+
+    def publish(self, events: pl.DataFrame):
+        with self.lock:
+            self.sequence += 1
+            self.batches.append((self.sequence, datetime.now(), events))
+            return self.sequence
+
+    def since(self, sequence: int = 0) -> pl.DataFrame:
+        with self.lock:
+            batches = [
+                events.with_columns(
+                    pl.lit(seq).alias("sequence"),
+                    pl.lit(published_at).alias("published_at"),
+                )
+                for seq, published_at, events in self.batches
+                if seq > sequence and len(events)
+            ]
+        if not batches:
+            return pl.DataFrame()
+        return pl.concat(batches, how="diagonal_relaxed")
+
+
+class AssemblyDeltaSync:
+    def __init__(self, differ: SnapshotDiffer, log: AssemblyEventLog):
+        self.differ = differ
+        self.log = log
+        self.lock = Lock()
+
+    def _seed(self):
+        if self.differ.previous is None:
+            # the seed is diffed against for the life of the process, so it is read from the primary
+            self.differ.previous = SelectInfos().select_bd_infos("SELECT * FROM assembly_line", primary=True).collect()
+
+    def sync(self, current: pl.DataFrame, batch_size: int = None, werk=None):
+        # with werk set, current holds that plant only and rows of other plants are never exited
+        with self.lock:
+            self._seed()
+            events = self.differ.diff(current, werk)
+
+            changed = events.filter(pl.col("event") != "exited").select(current.columns)
+            exited = events.filter(pl.col("event") == "exited").select(TABLE_KEYS["assembly_line"])
+
+            upserted, deleted = [], []
+            if len(changed):
+                upserted = WRITE_QUEUES.submit("assembly_line", changed, batch_size).result()["batch_sizes"]
+            if len(exited):
+                DeleteInfos().delete_df("assembly_line", exited, TABLE_KEYS["assembly_line"], batch_size, sizes=deleted)
+
+            self.differ.commit(current, werk)
+            sequence = self.log.publish(events)
+
+        counts = dict(events.group_by("event").len().iter_rows()) if len(events) else {}
+        return {
+            "sequence": sequence,
+            "entered": counts.get("entered", 0),
+            "moved": counts.get("moved", 0),
+            "exited": counts.get("exited", 0),
+            "batch_sizes": {"upsert": upserted, "delete": sorted(set(deleted))},
+        }
+
+
+DIFFER = SnapshotDiffer()
+EVENTS = AssemblyEventLog()
+DELTA_SYNC = AssemblyDeltaSync(DIFFER, EVENTS)
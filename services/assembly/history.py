@@ -0,0 +1,185 @@
+from datetime import datetime, timedelta
+from pathlib import Path
+from threading import Event, Lock, Thread
+from dotenv import load_dotenv
+from helpers.data.registry import SchemaRegistry
+import logging, polars as pl, os, shutil, time, uuid
+
+load_dotenv("config/.env")
+
+logger = logging.getLogger(__name__)
+
+DAY_FORMAT = "%Y-%m-%d"
+COMPACT_FILE = "compact.parquet"
+
+
+# -- APPEND-ONLY SNAPSHOT STORE - <root>/<day>/<hour>/part-*.parquet --
+class SnapshotHistory:
+    def __init__(self, root=None, retention_days: int = None, maintenance_interval: float = 300.0):
+        self.root = Path(root or os.getenv("SNAPSHOT_HISTORY_PATH", "storage/history"))
+        self.retention = timedelta(days=retention_days or int(os.getenv("SNAPSHOT_RETENTION_DAYS", "14")))
+        self.maintenance_interval = maintenance_interval
+        self.lock = Lock()
+        self.stop_event = Event()
+        self.thread = None
+
+    def _hour_dir(self, moment: datetime) -> Path:
+        return self.root / moment.strftime(DAY_FORMAT) / f"{moment.hour:02d}"
+
+    def _hour_of(self, path: Path) -> datetime:
+        return datetime.strptime(path.parent.name, DAY_FORMAT).replace(hour=int(path.name))
+
+    def _hour_dirs(self):
+        if not self.root.exists():
+            return []
+        return sorted(
+            hour for day in self.root.iterdir() if day.is_dir() and not day.name.startswith(".")
+            for hour in day.iterdir() if hour.is_dir()
+        )
+
+    def append(self, df: pl.DataFrame, captured_at: datetime = None) -> Path:
+        captured_at = captured_at or datetime.now()
+        directory = self._hour_dir(captured_at)
+        directory.mkdir(parents=True, exist_ok=True)
+
+        path = directory / f"part-{captured_at:%M%S%f}-{uuid.uuid4().hex[:8]}.parquet"
+        tmp = directory / f".{path.name}"
+        (
+            df.with_columns(
+                pl.col(pl.Categorical).cast(pl.Utf8),
+                pl.lit(captured_at).cast(pl.Datetime("us")).alias("captured_at"),
+            )
+            .write_parquet(tmp, statistics=True)
+        )
+        os.replace(tmp, path)
+        return path
+
+    def compact(self, now: datetime = None) -> int:
+        current = self._hour_dir(now or datetime.now())
+        compacted = 0
+
+        with self.lock:
+            for directory in self._hour_dirs():
+                if directory == current:
+                    continue
+                parts = sorted(directory.glob("part-*.parquet"))
+                if not parts or (len(parts) == 1 and not (directory / COMPACT_FILE).exists()):
+                    continue
+
+                sources = parts + [p for p in [directory / COMPACT_FILE] if p.exists()]
+                tmp = directory / f".{COMPACT_FILE}"
+                pl.concat(
+                    [pl.read_parquet(p) for p in sources], how="diagonal_relaxed"
+                ).sort("captured_at").write_parquet(tmp, statistics=True, row_group_size=100_000)
+                os.replace(tmp, directory / COMPACT_FILE)
+
+                for part in parts:
+                    part.unlink()
+                compacted += 1
+        return compacted
+
+    def prune(self, now: datetime = None) -> int:
+        cutoff = (now or datetime.now()) - self.retention
+        removed = 0
+
+        with self.lock:
+            for day in [d for d in self.root.iterdir() if d.is_dir()] if self.root.exists() else []:
+                try:
+                    expired = datetime.strptime(day.name, DAY_FORMAT) + timedelta(days=1) <= cutoff
+                except ValueError:
+                    continue
+                if expired:
+                    shutil.rmtree(day)
+                    removed += 1
+        return removed
+
+    def files(self, start: datetime, end: datetime):
+        first = start.replace(minute=0, second=0, microsecond=0)
+        return [
+            path
+            for directory in self._hour_dirs()
+            if first <= self._hour_of(directory) < end
+            for path in sorted(directory.glob("*.parquet"))
+        ]
+
+    def scan(self, start: datetime, end: datetime, columns=None, werk=None) -> pl.LazyFrame:
+        # hour directories prune the file list, row-group statistics prune the rest
+        files = self.files(start, end)
+        if not files:
+            return pl.LazyFrame(schema={"captured_at": pl.Datetime("us")})
+
+        lf = pl.scan_parquet(files).filter(
+            (pl.col("captured_at") >= start) & (pl.col("captured_at") < end)
+        )
+        if werk:
+            lf = lf.filter(pl.col("werk") == werk)
+        if columns:
+            lf = lf.select(list(dict.fromkeys(["captured_at", *columns])))
+        return lf
+
+    def snapshots(self, start: datetime, end: datetime, columns=None, werk=None):
+        df = self.scan(start, end, columns, werk).collect()
+        if not len(df):
+            return
+        for snapshot in df.sort("captured_at").partition_by("captured_at", maintain_order=True):
+            yield snapshot["captured_at"][0], SchemaRegistry.apply(snapshot.drop("captured_at"))
+
+    def _maintain(self):
+        while not self.stop_event.wait(self.maintenance_interval):
+            try:
+                self.compact()
+                self.prune()
+            except Exception:
+                logger.exception("snapshot history maintenance failed, will retry")
+
+    def start(self):
+        if self.thread and self.thread.is_alive():
+            return
+        self.stop_event.clear()
+        self.thread = Thread(target=self._maintain, daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.stop_event.set()
+        if self.thread:
+            self.thread.join()
+
+
+# -- REPLAY - FEEDS RECORDED SNAPSHOTS THROUGH SYNC + CONSUMPTION --
+class SnapshotReplay:
+    def __init__(self, history: SnapshotHistory, delta_sync, consumer, speed: float = 0.0):
+        self.history = history
+        self.delta_sync = delta_sync
+        self.consumer = consumer
+        self.speed = speed
+
+    def run(self, start: datetime, end: datetime, werk=None, batch_size: int = None):
+        timings, previous, clock = [], None, None
+
+        for captured_at, snapshot in self.history.snapshots(start, end, werk=werk):
+            if self.speed > 0 and previous is not None:
+                # recorded gap compressed by speed, minus time the cycle already spent
+                wait = (captured_at - previous).total_seconds() / self.speed - (time.perf_counter() - clock)
+                if wait > 0:
+                    time.sleep(wait)
+            previous, clock = captured_at, time.perf_counter()
+
+            started = time.perf_counter()
+            events = self.delta_sync.sync(snapshot, batch_size, werk)
+            synced = time.perf_counter()
+            consumed = self.consumer._update_infos(werk=werk)
+            timings.append({
+                "captured_at": captured_at,
+                "rows": len(snapshot),
+                "entered": events["entered"],
+                "moved": events["moved"],
+                "exited": events["exited"],
+                "parts": consumed["parts"],
+                "sync_ms": (synced - started) * 1000,
+                "consume_ms": (time.perf_counter() - synced) * 1000,
+            })
+
+        return pl.DataFrame(timings) if timings else pl.DataFrame()
+
+
+HISTORY = SnapshotHistory()
@@ -1,11 +1,13 @@
 import polars as pl
+from helpers.data.registry import SchemaRegistry
 
 
 class DefineDataFrame:
     def __init__(self, response: dict):
         self.response = response
 
-    def extract_car_records(self, cleaned):
+    def extract_car_records(self, cleaned=None):
+        cleaned = self.response if cleaned is None else cleaned
         registers = []
         for lane_key, lane_val in cleaned.items():
             if lane_key.startswith("lane_") or lane_key.startswith("reception"):
@@ -40,5 +42,5 @@ class TransformDataFrame:
     
     def attach_fx4pd(self):
         return self.df.with_columns(
-            (pl.col("werk") + pl.col("spj") + pl.col("knr")).alias("knr_fx4pd")
-        )
\ No newline at end of file
+            (pl.col("werk").cast(pl.Utf8) + pl.col("spj").cast(pl.Utf8) + pl.col("knr").cast(pl.Utf8)).alias("knr_fx4pd")
+        ).pipe(SchemaRegistry.apply)
\ No newline at end of file
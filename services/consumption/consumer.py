@@ -1,39 +1,50 @@
-from database.queries import SelectInfos, UpdateInfos
+from concurrent.futures import ThreadPoolExecutor
+from database.connector import pool_workers
+from database.queries import SelectInfos
+from .ledger import LEDGER
 import polars as pl
-    
+
 
 class ConsumeValues(SelectInfos):
-    def __init__(self):
+    def __init__(self, ledger=LEDGER):
         SelectInfos.__init__(self)
+        self.ledger = ledger
 
-    def values_to_consume(self):
-        df_values_to_consume = self.select_bd_infos_polars("""
-            SELECT 
-                forecast.partnumber, 
-                forecast.takt, 
-                forecast.rack, 
-                forecast.knr_fx4pd, 
-                forecast.qty_usage, 
-                assembly_line.takt,
-                pkmc.partnumber,
-                pkmc.lb_balance,
-                pkmc.lb_balance        
+    def values_to_consume(self, werk=None):
+        # a bound werk folds the IS NULL branch away, so both tables are still pruned to one partition
+        return self.select_bd_infos("""
+            SELECT
+                forecast.partnumber,
+                SUM(forecast.qty_usage) AS qty_usage
             FROM forecast
-            INNER JOIN assembly_line 
-                ON forecast.knr_fx4pd = assembly_line.knr_fx4pd 
+            INNER JOIN assembly_line
+                ON forecast.werk = assembly_line.werk
+               AND forecast.knr_fx4pd = assembly_line.knr_fx4pd
                AND forecast.takt = assembly_line.takt
-            INNER JOIN pkmc
-                ON pkmc.partnumber = forecast.partnumber
-        """)
+            WHERE (%s IS NULL OR (forecast.werk = %s AND assembly_line.werk = %s))
+            GROUP BY forecast.partnumber
+        """, (werk or None,) * 3).with_columns(
+            pl.col("qty_usage").cast(pl.Float64).fill_null(0)
+        ).collect()
+
+    def get_raw_response(self, werk=None):
+        return self.values_to_consume(werk).to_dicts()
+
+    def _consume_plant(self, werk):
+        return self.ledger.consume(ConsumeValues(self.ledger).values_to_consume(werk))
 
-        return df_values_to_consume.with_columns(
-            (pl.col("lb_balance") - pl.col("qty_usage").fill_null(0)).alias("lb_balance")
-        ).select(["partnumber", "lb_balance"]).collect()
+    def _update_infos(self, df=None, werk=None):
+        if df is not None:
+            parts = self.ledger.consume(df)
+        elif werk:
+            parts = self.ledger.consume(self.values_to_consume(werk))
+        else:
+            plants = self.select_plants("assembly_line")
+            with ThreadPoolExecutor(max_workers=pool_workers(len(plants))) as executor:
+                parts = sum(executor.map(self._consume_plant, plants))
 
-    def _update_infos(self, df):
-        UpdateInfos().update_df(
-            table="pkmc",
-            df=df,
-            key_column="partnumber",
-            batch_size=1000
-        )
\ No newline at end of file
+        return {
+            "message": "Consumo aplicado ao ledger.",
+            "parts": parts,
+            "pending_flush": int(self.ledger.dirty.sum()),
+        }
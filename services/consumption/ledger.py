@@ -0,0 +1,178 @@
+from threading import Event, Lock, Thread
+from database.queries import SelectInfos, UpdateInfos
+from helpers.data.registry import SchemaRegistry
+import logging, numpy as np, polars as pl
+
+logger = logging.getLogger(__name__)
+
+PKMC_LEDGER_QUERY = """
+    SELECT partnumber, lb_balance, qty_per_box, qty_for_restock, total_theoretical_qty
+    FROM pkmc
+"""
+
+LEDGER_TYPES = {
+    "lb_balance": pl.Float64,
+    "qty_per_box": pl.Float64,
+    "qty_for_restock": pl.Float64,
+    "total_theoretical_qty": pl.Float64,
+}
+
+
+class InventoryLedger:
+    def __init__(self, flush_interval: float = 5.0, batch_size: int = None):
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self.lock = Lock()
+        self.flush_lock = Lock()
+        self.stop_event = Event()
+        self.thread = None
+        # part numbers already looked up and absent from pkmc, cleared by recover()
+        self.unknown = set()
+        self._reset(pl.DataFrame(schema={"partnumber": pl.Utf8, **LEDGER_TYPES}))
+
+    def _reset(self, df: pl.DataFrame, pending=None):
+        self.index = SchemaRegistry.apply(df.select("partnumber")).with_row_index(name="part_id")
+        self.partnumbers = df["partnumber"].cast(pl.Utf8).to_numpy()
+        self.qty_per_box = df["qty_per_box"].fill_null(0).to_numpy().astype(np.float64)
+        self.qty_for_restock = df["qty_for_restock"].fill_null(0).to_numpy().astype(np.float64)
+        self.total_theoretical_qty = df["total_theoretical_qty"].fill_null(0).to_numpy().astype(np.float64)
+        # pending holds the signed deltas not yet in pkmc, balance is the database value plus pending
+        self.pending = np.zeros(len(df), dtype=np.float64) if pending is None else pending
+        self.balance = df["lb_balance"].fill_null(0).to_numpy().astype(np.float64) + self.pending
+
+    @property
+    def dirty(self):
+        return self.pending != 0
+
+    def _load(self, partnumbers=None):
+        query, params = PKMC_LEDGER_QUERY, None
+        if partnumbers is not None:
+            query += f"WHERE partnumber IN ({', '.join(['%s'] * len(partnumbers))})"
+            params = tuple(partnumbers)
+        return (
+            # the ledger keeps these balances until the next recover, a lagging replica is not an option
+            SelectInfos().select_bd_infos(query, params, primary=True).collect()
+            .cast(LEDGER_TYPES)
+            .unique(subset="partnumber", keep="last", maintain_order=True)
+        )
+
+    def recover(self):
+        df = self._load()
+        with self.lock:
+            # deltas that were not flushed yet survive a reload on top of the fresh balances
+            # explicit schema: an empty ledger holds an object array, which would not join on Utf8
+            carried = pl.DataFrame(
+                {"partnumber": self.partnumbers.tolist(), "_pending": self.pending},
+                schema={"partnumber": pl.Utf8, "_pending": pl.Float64},
+            )
+            pending = (
+                df.select(pl.col("partnumber").cast(pl.Utf8))
+                .join(carried, on="partnumber", how="left")["_pending"]
+                .fill_null(0).to_numpy().astype(np.float64)
+            )
+            self._reset(df, pending)
+            self.unknown = set()
+        return len(df)
+
+    def _admit(self, partnumbers):
+        # parts created in pkmc after recover() are loaded on first use
+        with self.lock:
+            known = set(self.partnumbers.tolist()) | self.unknown
+        missing = [p for p in dict.fromkeys(partnumbers) if p is not None and p not in known]
+        if not missing:
+            return
+
+        df = self._load(missing)
+        with self.lock:
+            # a miss is remembered, so parts that are not in pkmc cost one lookup, not one per cycle
+            self.unknown.update(set(missing) - set(df["partnumber"].cast(pl.Utf8).to_list()))
+            df = df.filter(~pl.col("partnumber").cast(pl.Utf8).is_in(self.partnumbers.tolist()))
+            if not len(df):
+                return
+            offset = len(self.partnumbers)
+            self.index = pl.concat([
+                self.index,
+                SchemaRegistry.apply(df.select("partnumber")).with_row_index(name="part_id", offset=offset),
+            ], how="vertical_relaxed")
+            self.partnumbers = np.concatenate([self.partnumbers, df["partnumber"].cast(pl.Utf8).to_numpy()])
+            self.qty_per_box = np.concatenate([self.qty_per_box, df["qty_per_box"].fill_null(0).to_numpy()])
+            self.qty_for_restock = np.concatenate([self.qty_for_restock, df["qty_for_restock"].fill_null(0).to_numpy()])
+            self.total_theoretical_qty = np.concatenate([
+                self.total_theoretical_qty, df["total_theoretical_qty"].fill_null(0).to_numpy()
+            ])
+            self.pending = np.concatenate([self.pending, np.zeros(len(df))])
+            self.balance = np.concatenate([self.balance, df["lb_balance"].fill_null(0).to_numpy()])
+
+    def _ids(self, df: pl.DataFrame):
+        self._admit(df["partnumber"].cast(pl.Utf8).to_list())
+        joined = df.join(self.index, on="partnumber", how="inner")
+        return joined["part_id"].to_numpy(), joined
+
+    def _add(self, ids, deltas):
+        with self.lock:
+            np.add.at(self.balance, ids, deltas)
+            np.add.at(self.pending, ids, deltas)
+        return len(ids)
+
+    def apply(self, df: pl.DataFrame, column: str, sign: int = 1):
+        ids, joined = self._ids(df)
+        return self._add(ids, joined[column].fill_null(0).to_numpy().astype(np.float64) * sign)
+
+    def consume(self, df: pl.DataFrame):
+        return self.apply(df, "qty_usage", sign=-1)
+
+    def replenish(self, df: pl.DataFrame):
+        ids, joined = self._ids(df)
+        return self._add(ids, joined["qty_boxes"].fill_null(0).to_numpy().astype(np.float64) * self.qty_per_box[ids])
+
+    def snapshot(self, dirty_only: bool = False) -> pl.DataFrame:
+        with self.lock:
+            ids = np.flatnonzero(self.dirty) if dirty_only else np.arange(len(self.balance))
+            return SchemaRegistry.apply(pl.DataFrame({
+                "partnumber": self.partnumbers[ids],
+                "lb_balance": np.rint(self.balance[ids]).astype(np.int64),
+            }))
+
+    def flush(self):
+        with self.flush_lock:
+            with self.lock:
+                # whole units only, the fractional rest stays pending for the next flush
+                deltas = np.trunc(self.pending)
+                ids = np.flatnonzero(deltas)
+                if not len(ids):
+                    return 0
+                deltas = deltas[ids]
+                df = pl.DataFrame({
+                    "partnumber": self.partnumbers[ids],
+                    "lb_balance": deltas.astype(np.int64),
+                })
+
+            # signed deltas, so concurrent writers of lb_balance are added to instead of overwritten
+            UpdateInfos().increment_df("pkmc", df, "partnumber", self.batch_size)
+
+            with self.lock:
+                self.pending[ids] -= deltas
+        return len(ids)
+
+    def _write_behind(self):
+        while not self.stop_event.wait(self.flush_interval):
+            try:
+                self.flush()
+            except Exception:
+                logger.exception("ledger flush failed, deltas kept for the next attempt")
+
+    def start(self):
+        if self.thread and self.thread.is_alive():
+            return
+        self.stop_event.clear()
+        self.thread = Thread(target=self._write_behind, daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.stop_event.set()
+        if self.thread:
+            self.thread.join()
+        self.flush()
+
+
+LEDGER = InventoryLedger()
@@ -1,9 +1,38 @@
-from database.queries import SelectInfos
+from database.queries import SelectInfos, SelectQuery
+import polars as pl
+
+
+RECEPTION_COLUMNS = {
+    column: column
+    for column in ["werk", "knr", "knr_fx4pd", "model", "lfdnr_sequence", "spj", "takt"]
+}
 
 
 class ReturnBuffAssemblyLineValues(SelectInfos):
     def __init__(self):
         SelectInfos.__init__(self)
 
-    def return_values_from_db(self):
-        return self.select_bd_infos("SELECT knr, model, lfdnr_sequence FROM auto_line_feeding.assembly_line WHERE lane = 'reception'").lazy()
\ No newline at end of file
+    @staticmethod
+    def reception_query(werk=None, columns=None, model=None, limit=None, offset=0):
+        return (
+            SelectQuery(
+                "auto_line_feeding.assembly_line", RECEPTION_COLUMNS,
+                where=["lane = 'reception'"],
+                order_by="werk, lfdnr_sequence" if limit is not None else None,
+            )
+            .select(columns or ["werk", "knr", "model", "lfdnr_sequence"])
+            .where("werk", werk)
+            .where("model", model)
+            .limit(limit, offset)
+        )
+
+    def return_values_from_db(self, werk=None, **filters):
+        return self.select_query(self.reception_query(werk, **filters)).lazy()
+
+    def return_sequence_from_db(self, werk=None):
+        return (
+            self.select_query(self.reception_query(werk, columns=["knr_fx4pd", "lfdnr_sequence"]))
+            .sort(pl.col("lfdnr_sequence").cast(pl.Int64, strict=False), nulls_last=True)
+            .select("knr_fx4pd")
+            .collect()
+        )
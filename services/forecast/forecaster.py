@@ -1,29 +1,48 @@
-from database.queries import SelectInfos
-from helpers.data.cleaner import CleanerBase
+from database.queries import SelectInfos, SelectQuery
 import polars as pl
 
 
+FORECAST_COLUMNS = {
+    "werk": "fx4pd.werk",
+    "knr_fx4pd": "fx4pd.knr_fx4pd",
+    "partnumber": "fx4pd.partnumber",
+    "qty_usage": "fx4pd.qty_usage",
+    "qty_unit": "fx4pd.qty_unit",
+    "num_reg_circ": "pkmc.num_reg_circ",
+    "takt": "pk05.takt",
+    "rack": "pkmc.rack",
+    "lb_balance": "pkmc.lb_balance",
+    "total_theoretical_qty": "pkmc.total_theoretical_qty",
+    "qty_for_restock": "pkmc.qty_for_restock",
+    "qty_per_box": "pkmc.qty_per_box",
+    "qty_max_box": "pkmc.qty_max_box",
+}
+
+FORECAST_SOURCE = """
+    fx4pd
+    INNER JOIN pkmc
+        ON pkmc.partnumber = fx4pd.partnumber
+    INNER JOIN pk05
+        ON pk05.supply_area = pkmc.supply_area
+"""
+
+
 class DefineForecastValues(SelectInfos):
-    def join_fx4pd_pkmc_pk05(self):
-        return self.select_bd_infos(
-            """
-            SELECT
-                fx4pd.knr_fx4pd,
-                fx4pd.partnumber,
-                fx4pd.qty_usage,
-                fx4pd.qty_unit,
-                pkmc.num_reg_circ,
-                pk05.takt,
-                pkmc.rack,
-                pkmc.lb_balance,
-                pkmc.total_theoretical_qty,
-                pkmc.qty_for_restock,
-                pkmc.qty_per_box,
-                pkmc.qty_max_box
-            FROM fx4pd
-            INNER JOIN pkmc
-                ON pkmc.partnumber = fx4pd.partnumber
-            INNER JOIN pk05
-                ON pk05.supply_area = pkmc.supply_area
-            """
-        )
\ No newline at end of file
+    @staticmethod
+    def forecast_query(werk=None, columns=None, partnumber=None, rack=None, takt=None, limit=None, offset=0):
+        return (
+            SelectQuery(
+                FORECAST_SOURCE, FORECAST_COLUMNS,
+                # primary key order keeps limit/offset pages stable and index-driven
+                order_by="fx4pd.werk, fx4pd.knr_fx4pd, fx4pd.partnumber" if limit is not None else None,
+            )
+            .select(columns)
+            .where("werk", werk)
+            .where("partnumber", partnumber)
+            .where("rack", rack)
+            .where("takt", takt)
+            .limit(limit, offset)
+        )
+
+    def join_fx4pd_pkmc_pk05(self, werk=None, **filters):
+        return self.select_query(self.forecast_query(werk, **filters))
@@ -1,26 +1,32 @@
 from helpers.data.cleaner import CleanerBase
+from helpers.data.normalize import Normalize
 import polars as pl
 
 
+# FX4PD exports carry no stable header names, columns are declared by position
+FX4PD_COLUMNS = {
+    0: "knr_fx4pd",
+    1: "partnumber",
+    5: "qty_usage",
+    6: "qty_unit",
+}
+
+
 class ReturnFX4PDValues(CleanerBase):
     def __init__(self):
         CleanerBase.__init__(self)
 
     def create_fx4pd_df(self):
-        return self._load_file("FX4PD_PATH").lazy()
+        return self._load_file("FX4PD_PATH", columns=list(FX4PD_COLUMNS)).lazy()
     
     def rename_select_columns(self, df):
-        rename_map = {
-            df.columns[0]: "knr_fx4pd",
-            df.columns[1]: "partnumber",
-            df.columns[5]: "qty_usage",
-            df.columns[6]: "qty_unit",
-        }
+        rename_map = dict(zip(df.columns, FX4PD_COLUMNS.values()))
         return self._rename(df, rename_map)
     
     def clean_column(self, df: pl.LazyFrame | pl.DataFrame):
         df = df.with_columns(
-            pl.col(pl.Utf8).str.replace_all(" ", "")
+            Normalize.no_spaces(pl.col(pl.Utf8).exclude("partnumber")),
+            Normalize.partnumber("partnumber"),
         )
 
         df = df.filter(
@@ -34,4 +40,6 @@ class ReturnFX4PDValues(CleanerBase):
             qty_unit = pl.col("qty_unit").cast(pl.Int32,  strict=False).fill_null(0),
         )
 
+        df = df.with_columns(Normalize.werk("knr_fx4pd"))
+
         return df
\ No newline at end of file
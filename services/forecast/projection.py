@@ -0,0 +1,111 @@
+from database.queries import SelectInfos
+from helpers.data.registry import SchemaRegistry
+from orchestrator.compute import COMPUTE
+from threading import Lock
+import numpy as np, polars as pl
+
+
+class BillOfMaterialsMatrix:
+    def __init__(self, fx4pd: pl.DataFrame):
+        fx4pd = fx4pd.select(["knr_fx4pd", "partnumber", "qty_usage"]).drop_nulls()
+
+        cars = fx4pd.select(pl.col("knr_fx4pd").unique(maintain_order=True)).with_row_index(name="car_id")
+        parts = fx4pd.select(pl.col("partnumber").unique(maintain_order=True)).with_row_index(name="part_id")
+        coo = (
+            fx4pd
+            .join(cars, on="knr_fx4pd")
+            .join(parts, on="partnumber")
+            .group_by(["car_id", "part_id"])
+            .agg(pl.col("qty_usage").sum())
+            .sort(["car_id", "part_id"])
+        )
+
+        # CSR: row i holds the bill of materials of car i
+        car_ids = coo["car_id"].to_numpy()
+        self.indptr = np.zeros(len(cars) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(car_ids, minlength=len(cars)), out=self.indptr[1:])
+        self.indices = coo["part_id"].to_numpy().astype(np.int64)
+        self.data = coo["qty_usage"].to_numpy().astype(np.float64)
+
+        self.cars = cars
+        self.parts = parts
+
+    @property
+    def shape(self):
+        return (len(self.cars), len(self.parts))
+
+    def rows_for(self, sequence: pl.DataFrame) -> np.ndarray:
+        return (
+            sequence.select("knr_fx4pd")
+            .join(self.cars, on="knr_fx4pd", how="left")
+            ["car_id"].fill_null(-1).cast(pl.Int64).to_numpy()
+        )
+
+    def gather(self, rows: np.ndarray):
+        # multiplies the (takt x car) selection matrix by the CSR matrix, returned as COO
+        valid = rows >= 0
+        takts, rows = np.flatnonzero(valid), rows[valid]
+        starts, ends = self.indptr[rows], self.indptr[rows + 1]
+        lengths = ends - starts
+
+        offsets = np.arange(lengths.sum()) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+        positions = np.repeat(starts, lengths) + offsets
+        return np.repeat(takts, lengths), self.indices[positions], self.data[positions]
+
+
+class ConsumptionProjection:
+    def __init__(self):
+        self.matrix = None
+        self.lock = Lock()
+
+    def refresh(self):
+        fx4pd = SelectInfos().select_bd_infos(
+            "SELECT knr_fx4pd, partnumber, qty_usage FROM fx4pd", primary=True
+        ).collect()
+        # the select waits outside the compute slots, building the CSR matrix takes one
+        matrix = COMPUTE.run(BillOfMaterialsMatrix, fx4pd)
+        with self.lock:
+            self.matrix = matrix
+        return matrix
+
+    def current(self) -> BillOfMaterialsMatrix:
+        # read once: an invalidate() racing with the caller can reset self.matrix at any time
+        matrix = self.matrix
+        return matrix if matrix is not None else self.refresh()
+
+    def invalidate(self):
+        with self.lock:
+            self.matrix = None
+
+    def project(self, sequence: pl.DataFrame, horizon: int) -> pl.DataFrame:
+        matrix = self.current()
+
+        rows = matrix.rows_for(sequence.head(horizon))
+        takts, parts, qty = matrix.gather(rows)
+
+        return SchemaRegistry.apply(
+            pl.DataFrame({"takt_offset": takts + 1, "part_id": parts, "demand": qty})
+            .cast({"part_id": pl.UInt32})
+            .group_by(["part_id", "takt_offset"])
+            .agg(pl.col("demand").sum())
+            .sort(["part_id", "takt_offset"])
+            .with_columns(pl.col("demand").cum_sum().over("part_id").alias("cumulative_demand"))
+            .join(matrix.parts, on="part_id")
+            .select(["partnumber", "takt_offset", "demand", "cumulative_demand"])
+        )
+
+    def totals(self, sequence: pl.DataFrame, horizon: int) -> pl.DataFrame:
+        matrix = self.current()
+
+        _, parts, qty = matrix.gather(matrix.rows_for(sequence.head(horizon)))
+        demand = np.bincount(parts, weights=qty, minlength=len(matrix.parts))
+        return (
+            matrix.parts
+            .with_columns(pl.Series("demand", demand))
+            .filter(pl.col("demand") > 0)
+            .select(["partnumber", "demand"])
+            .sort("demand", descending=True)
+        )
+
+
+PROJECTION = ConsumptionProjection()
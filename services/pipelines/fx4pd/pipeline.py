@@ -0,0 +1,32 @@
+from concurrent.futures import ThreadPoolExecutor
+from services.forecast.fx4pd import ReturnFX4PDValues
+from services.forecast.projection import PROJECTION
+from helpers.services.forecast import BuildPipeline
+from database.connector import MYSQL_POOL_SIZE, pool_workers
+from database.queries import UpsertInfos
+from orchestrator.compute import COMPUTE, PIPELINE
+import polars as pl, os
+
+
+def fx4pd_cleaner() -> pl.LazyFrame:
+    return BuildPipeline.build_forecast(ReturnFX4PDValues())
+
+
+def fx4pd_upserter(df_fx4pd):
+    if isinstance(df_fx4pd, pl.LazyFrame):
+        df_fx4pd = df_fx4pd.collect()
+
+    # one worker per plant, the pool's connections are shared between them
+    plants = df_fx4pd.partition_by("werk")
+    workers = pool_workers(len(plants))
+    parallelism = max(1, min(int(os.getenv("UPSERT_PARALLELISM", "4")), MYSQL_POOL_SIZE) // workers)
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        return sum(executor.map(
+            lambda df_plant: UpsertInfos().upsert_df("fx4pd", df_plant, parallelism=parallelism),
+            plants
+        ))
+
+def fx4pd_pipeline() -> pl.DataFrame:
+    df_fx4pd = COMPUTE.run(lambda: fx4pd_cleaner().collect(), priority=PIPELINE)
+    fx4pd_upserter(df_fx4pd)
+    PROJECTION.invalidate()
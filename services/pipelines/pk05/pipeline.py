@@ -1,5 +1,7 @@
 from .pk05 import PK05_Cleaner, PK05_DefineDataframe
 from database.queries import UpsertInfos
+from orchestrator.compute import COMPUTE, PIPELINE
+from helpers.data.registry import SchemaRegistry
 import polars as pl
 
 
@@ -11,12 +13,13 @@ def pk05_cleaner() -> pl.DataFrame:
         .pipe(cleaner.rename_columns)
         .pipe(cleaner.create_columns)
         .pipe(cleaner.filter_columns)
+        .pipe(SchemaRegistry.apply)
     )
 
 
 def pk05_upserter(df_pkmc):
-    UpsertInfos().upsert_df("pk05", df_pkmc, 1000)
+    UpsertInfos().upsert_df("pk05", df_pkmc)
 
 def pk05_pipeline() -> pl.DataFrame:
-    df_pk05 = pk05_cleaner()
+    df_pk05 = COMPUTE.run(pk05_cleaner, priority=PIPELINE)
     pk05_upserter(df_pk05)
@@ -1,13 +1,23 @@
 from helpers.data.cleaner import CleanerBase
+from helpers.data.normalize import Normalize
 import polars as pl
 
 
+PK05_COLUMNS = {
+    "Área abastec.prod.": "supply_area",
+    "Depósito": "deposit",
+    "Responsável": "responsible",
+    "Ponto de descarga": "discharge_point",
+    "Denominação SupM": "description",
+}
+
+
 class PK05_DefineDataframe(CleanerBase):
     def __init__(self):
         CleanerBase.__init__(self)
 
     def create_df(self):
-        return self._load_file("PK05_PATH").lazy()
+        return self._load_file("PK05_PATH", columns=list(PK05_COLUMNS)).lazy()
 
 
 class PK05_Cleaner(CleanerBase):
@@ -23,17 +33,10 @@ class PK05_Cleaner(CleanerBase):
     
     def create_columns(self, df):
         df = df.with_columns(
-            pl.col("description").str.extract(r"(T\d+)", 1).alias("takt")
+            Normalize.takt("description")
         )
         df = df.with_row_index(name="id")
         return df
 
     def rename_columns(self, df):
-        rename_map = {
-            "Área abastec.prod.": "supply_area",
-            "Depósito": "deposit",
-            "Responsável": "responsible",
-            "Ponto de descarga": "discharge_point",
-            "Denominação SupM": "description",
-        }
-        return self._rename(df, rename_map)
\ No newline at end of file
+        return self._rename(df, PK05_COLUMNS)
\ No newline at end of file
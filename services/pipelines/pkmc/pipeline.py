@@ -1,5 +1,8 @@
 from .pkmc import PKMC_Cleaner, PKMC_DefineDataframe
 from database.queries import UpsertInfos
+from orchestrator.compute import COMPUTE, PIPELINE
+from helpers.data.registry import SchemaRegistry
+from services.consumption.ledger import LEDGER
 import polars as pl
 
 
@@ -12,11 +15,15 @@ def pkmc_cleaner() -> pl.DataFrame:
         .pipe(cleaner.filter_columns)
         .pipe(cleaner.clean_columns)
         .pipe(cleaner.create_columns)
+        .pipe(SchemaRegistry.apply)
     )
 
 def pkmc_upserter(df_pkmc):
-    UpsertInfos().upsert_df("pkmc", df_pkmc, 1000)
+    UpsertInfos().upsert_df("pkmc", df_pkmc)
+    # new parts and reloaded balances reach the ledger without waiting for a restart
+    LEDGER.recover()
 
 def pkmc_pipeline() -> pl.DataFrame:
-    df_pkmc = pkmc_cleaner()
+    # only the cleaning holds a compute slot, the upsert waits on MySQL outside it
+    df_pkmc = COMPUTE.run(pkmc_cleaner, priority=PIPELINE)
     pkmc_upserter(df_pkmc)
\ No newline at end of file
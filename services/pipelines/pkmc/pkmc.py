@@ -1,13 +1,28 @@
 from helpers.data.cleaner import CleanerBase
+from helpers.data.normalize import Normalize
 import polars as pl
 
 
+PKMC_COLUMNS = {
+    "Material": "partnumber",
+    "Área abastec.prod.": "supply_area",
+    "Nº circ.regul.": "num_reg_circ",
+    "Tipo de depósito": "deposit_type",
+    "Posição no depósito": "deposit_position",
+    "Container": "container",
+    "Texto breve de material": "description",
+    "Norma de embalagem": "pack_standard",
+    "Quantidade Kanban": "qty_per_box",
+    "Posição de armazenamento": "qty_max_box",
+}
+
+
 class PKMC_DefineDataframe(CleanerBase):
     def __init__(self):
         CleanerBase.__init__(self)
 
     def create_df(self):
-        return self._load_file("PKMC_PATH").lazy()
+        return self._load_file("PKMC_PATH", columns=list(PKMC_COLUMNS)).lazy()
     
 
 class PKMC_Cleaner(CleanerBase):
@@ -22,44 +37,19 @@ class PKMC_Cleaner(CleanerBase):
     
     def clean_columns(self, df):
         return df.with_columns(
-            pl.col("qty_max_box")
-                .cast(pl.Utf8)
-                .str.replace_all(r"(?i)max", "")
-                .str.replace_all(r"[ :]", "")
-                .str.replace_all(r"\D+", "")
-                .cast(pl.Int64, strict=False)
-                .fill_null(0),
-
-            pl.col("partnumber")
-                .cast(pl.Utf8)
-                .str.strip()         
-                .str.replace_all(r"\s+", "")
-                .str.replace_all(r"\.", "")
-                .str.replace_all(r"[^\w-]", "")
-                .str.to_uppercase()
+            Normalize.digits("qty_max_box"),
+            Normalize.partnumber("partnumber"),
         )
 
     def create_columns(self, df):
         df = df.with_columns([
             (pl.col("qty_per_box") * pl.col("qty_max_box")).alias("total_theoretical_qty"),
             (pl.col("qty_per_box") * (pl.col("qty_max_box") - 1)).alias("qty_for_restock"),
-            pl.col("supply_area").str.extract(r"(P\d+[A-Z]?)", 1).alias("rack")
+            Normalize.rack("supply_area")
         ]).drop_nulls("rack")
         df = df.with_row_index(name="id")
         return df
 
     def rename_columns(self, df):
-        rename_map = {
-            "Material": "partnumber",
-            "Área abastec.prod.": "supply_area",
-            "Nº circ.regul.": "num_reg_circ",
-            "Tipo de depósito": "deposit_type",
-            "Posição no depósito": "deposit_position",
-            "Container": "container",
-            "Texto breve de material": "description",
-            "Norma de embalagem": "pack_standard",
-            "Quantidade Kanban": "qty_per_box", 
-            "Posição de armazenamento": "qty_max_box",
-        }
-        return self._rename(df, rename_map)
+        return self._rename(df, PKMC_COLUMNS)
     
\ No newline at end of file
@@ -1,26 +1,89 @@
 from os import listdir
 from os.path import isfile, join
+from pathlib import Path
+from threading import Lock
 from dotenv import load_dotenv
-import os
+from orchestrator.ingestion import INGESTION, pipeline_for_file
+import hashlib, json, os, tempfile
 
 load_dotenv("config/.env")
 
+CHUNK_SIZE = 1024 * 1024
+HASHES_FILE = ".hashes.json"
+# uploads run on the threadpool, the read-modify-write of the hashes file must not interleave
+HASHES_LOCK = Lock()
+
 
 class ListExcelFiles:
     def _list_files(self):
-        return [f for f in listdir(os.getenv("EXCEL_PATH")) if isfile(join(os.getenv("EXCEL_PATH"), f))]
+        return [
+            f for f in listdir(os.getenv("EXCEL_PATH"))
+            if isfile(join(os.getenv("EXCEL_PATH"), f)) and not f.startswith(".")
+        ]
 
 
 class UploadFiles:
+    def __init__(self):
+        self.excel_path = Path(os.getenv("EXCEL_PATH"))
+
+    def _load_hashes(self):
+        path = self.excel_path / HASHES_FILE
+        if not path.exists():
+            return {}
+        return json.loads(path.read_text(encoding="utf-8"))
+
+    def _save_hashes(self, hashes):
+        fd, tmp = tempfile.mkstemp(dir=self.excel_path, prefix=".hashes-")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(hashes, f, indent=2)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp, self.excel_path / HASHES_FILE)
+        except Exception:
+            os.remove(tmp)
+            raise
+
+    def _stream_to_temp(self, stream):
+        digest = hashlib.sha256()
+        size = 0
+        fd, tmp = tempfile.mkstemp(dir=self.excel_path, prefix=".upload-")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                for chunk in iter(lambda: stream.read(CHUNK_SIZE), b""):
+                    digest.update(chunk)
+                    f.write(chunk)
+                    size += len(chunk)
+                f.flush()
+                os.fsync(f.fileno())
+        except Exception:
+            os.remove(tmp)
+            raise
+        return tmp, digest.hexdigest(), size
+
     def _upload_files(self, file):
-        content = file.file.read()
-        with open(f"{os.getenv('EXCEL_PATH')}/{file.filename}", "wb") as f:
-            f.write(content)
+        filename = Path(file.filename).name
+        tmp, sha256, size = self._stream_to_temp(file.file)
+
+        target = self.excel_path / filename
+        with HASHES_LOCK:
+            hashes = self._load_hashes()
+            if hashes.get(filename) == sha256 and target.exists():
+                os.remove(tmp)
+                return {"filename": filename, "size": size, "sha256": sha256, "changed": False, "pipeline": None}
+
+            os.replace(tmp, target)
+            hashes[filename] = sha256
+            self._save_hashes(hashes)
+
+        pipeline = pipeline_for_file(target)
+        if pipeline:
+            INGESTION.enqueue(pipeline, sha256)
 
-        return {"filename": file.filename, "size": len(content)}
+        return {"filename": filename, "size": size, "sha256": sha256, "changed": True, "pipeline": pipeline}
 
 
 class DeleteFiles:
     def _delete_files(self, filename):
         os.remove(os.path.join(os.getenv("EXCEL_PATH"), filename))
-        return {"message": f"Arquivo '{filename}' removido com sucesso."}
\ No newline at end of file
+        return {"message": f"Arquivo '{filename}' removido com sucesso."}
@@ -1,9 +1,16 @@
+from concurrent.futures import Future
+from queue import Queue
+from threading import Thread
 from typing import Optional, Tuple
 from dotenv import load_dotenv
-import win32com.client
-import pythoncom
 import time, os
 
+try:
+    import win32com.client
+    import pythoncom
+except ImportError:
+    win32com = pythoncom = None
+
 
 load_dotenv("config/.env")
 
@@ -46,6 +53,40 @@ class SAP_SessionProvider:
         conn = app.OpenConnection(self.connection_name, True)
         return conn.Children(0)
 
+    def get_session(self, index: int):
+        app = self.launcher.get_application()
+        return app.Children(0).Children(index)
+
+    def session_count(self) -> int:
+        app = self.launcher.get_application()
+        if not app or app.Children.Count == 0:
+            return 0
+        return app.Children(0).Children.Count
+
+    def find_session(self, session_id: str):
+        return self.launcher.get_application().findById(session_id)
+
+    def create_session(self, timeout: float = 30.0) -> str:
+        # createSession returns immediately, the new window shows up in Children a moment later
+        app = self.launcher.get_application()
+        known = {app.Children(0).Children(i).Id for i in range(self.session_count())}
+        self.get_session(0).createSession()
+        deadline = time.monotonic() + timeout
+        while True:
+            created = [
+                app.Children(0).Children(i).Id for i in range(self.session_count())
+                if app.Children(0).Children(i).Id not in known
+            ]
+            if created:
+                return created[0]
+            if time.monotonic() > deadline:
+                raise TimeoutError("SAP não abriu uma nova sessão")
+            time.sleep(0.2)
+
+    def close_session(self, session_id: str):
+        session = self.find_session(session_id)
+        session.Parent.CloseSession(session_id)
+
 
 class SAP_Authenticator:
     def __init__(self):
@@ -67,7 +108,8 @@ class SAP_Client:
         self.already_opened = False
 
     def connect(self):
-        pythoncom.CoInitialize()
+        if pythoncom:
+            pythoncom.CoInitialize()
 
         sess = self.session_provider.get_existing_session()
         if sess:
@@ -85,4 +127,83 @@ class SAP_Client:
             self.connect()
         self.session.findById("wnd[0]/tbar[0]/okcd").Text = tcode
         self.session.findById("wnd[0]").sendVKey(0)
-        return self.session, self.already_opened
\ No newline at end of file
+        return self.session, self.already_opened
+
+
+# -- SESSION POOL - ONE THREAD PER DEDICATED SAP SESSION, EACH IN ITS OWN COM APARTMENT --
+class SAP_SessionClient:
+    def __init__(self, session, slot: int):
+        self.session = session
+        self.slot = slot
+
+    def run_transaction(self, tcode: str = "/n") -> Tuple[object, bool]:
+        self.session.findById("wnd[0]/tbar[0]/okcd").Text = tcode
+        self.session.findById("wnd[0]").sendVKey(0)
+        return self.session, True
+
+
+class SAP_SessionPool:
+    # SAP allows 6 sessions per connection, the first one stays with whoever logged in
+    MAX_SESSIONS = 5
+
+    def __init__(self, client: SAP_Client, size: int = None):
+        self.client = client
+        self.provider = client.session_provider
+        self.size = min(self.MAX_SESSIONS, size or int(os.getenv("SAP_POOL_SIZE", "3")))
+        self.session_ids = []
+        self.queues = []
+        self.threads = []
+
+    def open(self):
+        # the pool opens its own sessions, the operator's login session is never driven by it
+        self.client.connect()
+        self.session_ids = [self.provider.create_session() for _ in range(self.size)]
+
+        for slot, session_id in enumerate(self.session_ids):
+            queue = Queue()
+            thread = Thread(target=self._work, args=(slot, session_id, queue), daemon=True)
+            thread.start()
+            self.queues.append(queue)
+            self.threads.append(thread)
+        return self
+
+    def _work(self, slot: int, session_id: str, queue: Queue):
+        # COM objects are bound to the apartment that fetched them, so each thread looks its session up again
+        if pythoncom:
+            pythoncom.CoInitialize()
+        try:
+            sap = SAP_SessionClient(self.provider.find_session(session_id), slot)
+            while True:
+                job = queue.get()
+                if job is None:
+                    break
+                fn, future = job
+                if future.set_running_or_notify_cancel():
+                    try:
+                        future.set_result(fn(sap))
+                    except BaseException as e:
+                        future.set_exception(e)
+        finally:
+            if pythoncom:
+                pythoncom.CoUninitialize()
+
+    def submit(self, fn, slot: int) -> Future:
+        # jobs are bound to a slot by the caller, so the same work always lands on the same session
+        future = Future()
+        self.queues[slot % self.size].put((fn, future))
+        return future
+
+    def close(self):
+        for queue in self.queues:
+            queue.put(None)
+        for thread in self.threads:
+            thread.join()
+        for session_id in self.session_ids:
+            self.provider.close_session(session_id)
+        self.session_ids, self.queues, self.threads = [], [], []
+
+    def __enter__(self):
+        return self.open()
+
+    def __exit__(self, *exc):
+        self.close()
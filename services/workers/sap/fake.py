@@ -0,0 +1,155 @@
+from threading import Lock
+import re, time
+
+
+# -- FAKE SAP GUI SCRIPTING BACKEND - SAME OBJECT SHAPE AS THE COM ENGINE, NO WINDOWS NEEDED --
+LIST_ELEMENT = re.compile(r"/(lbl|chk)\[\d+,(\d+)\]$")
+SESSION_ID = re.compile(r"^/app/con\[(\d+)\]/ses\[(\d+)\]$")
+
+
+class FakeChildren:
+    def __init__(self, items):
+        self.items = items
+
+    @property
+    def Count(self):
+        return len(self.items)
+
+    def __call__(self, index):
+        return self.items[index]
+
+
+class FakeElement:
+    def __init__(self, session, element_id, text=""):
+        object.__setattr__(self, "session", session)
+        object.__setattr__(self, "element_id", element_id)
+        object.__setattr__(self, "Text", text)
+
+    def __setattr__(self, name, value):
+        object.__setattr__(self, name, value)
+        self.session.record(self.element_id, f"set {name}", value)
+
+    def __getattr__(self, action):
+        def call(*args):
+            self.session.record(self.element_id, action, args[0] if len(args) == 1 else args)
+            if action == "sendVKey" and args == (0,) and self.element_id == "wnd[0]":
+                self.session.enter()
+        return call
+
+
+class FakeSession:
+    def __init__(self, connection, index):
+        self.connection = connection
+        self.index = index
+        self.Id = f"{connection.Id}/ses[{index}]"
+        self.transaction = None
+        self.elements = {}
+
+    @property
+    def Parent(self):
+        return self.connection
+
+    def record(self, element_id, action, value=None):
+        time.sleep(self.connection.app.latency)
+        self.connection.app.log(self.index, self.transaction, element_id, action, value)
+
+    def enter(self):
+        okcd = self.elements.get("wnd[0]/tbar[0]/okcd")
+        if okcd is not None and okcd.Text.startswith("/n"):
+            self.transaction = okcd.Text[2:].upper()
+            self.elements = {"wnd[0]/tbar[0]/okcd": okcd}
+
+    def findById(self, element_id):
+        if element_id not in self.elements:
+            match = LIST_ELEMENT.search(element_id)
+            if match:
+                # a list row exists when the spool seeds any label on it, its other cells read as ""
+                if not self.connection.app.has_row(self.transaction, int(match.group(2))):
+                    raise RuntimeError(f"The control could not be found by id: {element_id}")
+                text = self.connection.app.spool.get((self.transaction, element_id), "")
+                self.elements[element_id] = FakeElement(self, element_id, text)
+            else:
+                self.elements[element_id] = FakeElement(self, element_id)
+        return self.elements[element_id]
+
+    def createSession(self):
+        self.connection.add_session()
+
+
+class FakeConnection:
+    def __init__(self, app, index):
+        self.app = app
+        self.Id = f"/app/con[{index}]"
+        self.sessions = []
+        self.opened = 0
+        self.add_session()
+
+    @property
+    def Children(self):
+        return FakeChildren(self.sessions)
+
+    def add_session(self):
+        # like SAP, a session keeps its id for life, closing one does not renumber the others
+        with self.app.lock:
+            self.sessions.append(FakeSession(self, self.opened))
+            self.opened += 1
+
+    def CloseSession(self, session_id):
+        with self.app.lock:
+            self.sessions = [session for session in self.sessions if session.Id != session_id]
+
+
+class FakeSAPApplication:
+    def __init__(self, latency: float = 0.0, spool=None):
+        self.latency = latency
+        self.lock = Lock()
+        self.connections = []
+        self.actions = []
+        # (transaction, element id) -> label text for list screens such as SP02
+        self.spool = spool if spool is not None else {
+            ("SP02", "wnd[0]/usr/lbl[51,0]"): "ALF_LT22",
+            ("SP02", "wnd[0]/usr/lbl[30,0]"): "08:00:00",
+        }
+
+    @property
+    def Children(self):
+        return FakeChildren(self.connections)
+
+    def OpenConnection(self, name, sync=True):
+        connection = FakeConnection(self, len(self.connections))
+        self.connections.append(connection)
+        return connection
+
+    def findById(self, element_id):
+        match = SESSION_ID.match(element_id)
+        if match:
+            connection = self.connections[int(match.group(1))]
+            for session in connection.sessions:
+                if session.Id == element_id:
+                    return session
+        raise RuntimeError(f"The control could not be found by id: {element_id}")
+
+    def has_row(self, transaction, row):
+        return any(
+            t == transaction and int(LIST_ELEMENT.search(element_id).group(2)) == row
+            for t, element_id in self.spool
+        )
+
+    def log(self, session, transaction, element_id, action, value):
+        with self.lock:
+            self.actions.append((session, transaction, element_id, action, value))
+
+    def transactions(self):
+        return {(session, transaction) for session, transaction, *_ in self.actions if transaction}
+
+
+class FakeLauncher:
+    def __init__(self, app: FakeSAPApplication = None):
+        self.app = app or FakeSAPApplication()
+        self.started = False
+
+    def start(self):
+        self.started = True
+
+    def get_application(self):
+        return self.app if self.started else None
@@ -0,0 +1,138 @@
+from datetime import datetime, timedelta
+from pathlib import Path
+from dotenv import load_dotenv
+from database.connector import MySQL_Connector
+from database.queries import SelectInfos
+from database.replicas import mark_write
+from helpers.data.normalize import Normalize
+from helpers.data.registry import SchemaRegistry
+import polars as pl, os
+
+load_dotenv("config/.env")
+
+
+class LT22_Report:
+    def __init__(self, path: Path = None):
+        self.path = path or Path(os.getenv("SAP_PATH")).resolve() / "alf_lt22"
+        self.material_header = os.getenv("LT22_MATERIAL_HEADER", "Material")
+
+    def exists(self) -> bool:
+        return self.path.exists()
+
+    def generated_at(self) -> datetime:
+        return datetime.fromtimestamp(self.path.stat().st_mtime)
+
+    def _rows(self):
+        for line in self.path.read_text(encoding="latin-1").splitlines():
+            if line.count("|") >= 2:
+                yield [cell.strip() for cell in line.strip().strip("|").split("|")]
+
+    def pending(self) -> pl.DataFrame:
+        # every LM01 box becomes one transfer order, so pending boxes = pending TO lines
+        header, materials = None, []
+        for row in self._rows():
+            if header is None:
+                if self.material_header in row:
+                    header = row
+                    column = row.index(self.material_header)
+                continue
+            if row != header and len(row) == len(header) and row[column]:
+                materials.append(row[column])
+
+        return SchemaRegistry.apply(
+            pl.DataFrame({"partnumber": materials}, schema={"partnumber": pl.Utf8})
+            .with_columns(Normalize.partnumber("partnumber"))
+            .group_by("partnumber")
+            .agg(pl.len().alias("pending_boxes"))
+        )
+
+
+class InFlightLedger(MySQL_Connector):
+    def __init__(self, max_age_hours: float = 24.0, inventory=None):
+        MySQL_Connector.__init__(self)
+        self.max_age = timedelta(hours=max_age_hours)
+        self.inventory = inventory
+
+    def _execute(self, sql, params=None, many=False):
+        mark_write()
+        cursor = self.connection.cursor()
+        try:
+            if many:
+                cursor.executemany(sql, params)
+            else:
+                cursor.execute(sql, params)
+            self.connection.commit()
+        except Exception:
+            self.connection.rollback()
+            raise
+        finally:
+            cursor.close()
+
+    def record(self, partnumber, num_reg_circ, boxes):
+        self._execute(
+            "INSERT INTO lm01_requests (partnumber, num_reg_circ, boxes) VALUES (%s, %s, %s)",
+            (partnumber, num_reg_circ, boxes)
+        )
+
+    def pending_requests(self) -> pl.DataFrame:
+        return SelectInfos().select_bd_infos("""
+            SELECT id, partnumber, boxes, requested_at
+            FROM lm01_requests
+            WHERE status = 'pending'
+            ORDER BY partnumber, requested_at
+        """).collect()
+
+    def outstanding(self) -> pl.DataFrame:
+        return (
+            self.pending_requests()
+            .group_by("partnumber")
+            .agg(pl.col("boxes").sum().alias("in_flight_boxes"))
+        )
+
+    def reconcile(self, report: LT22_Report):
+        self._execute(
+            "UPDATE lm01_requests SET status = 'expired' WHERE status = 'pending' AND requested_at < %s",
+            (datetime.now() - self.max_age,)
+        )
+        if not report.exists():
+            return 0
+
+        # requests submitted after the report was generated cannot appear in it yet
+        generated_at = report.generated_at()
+        requests = self.pending_requests().filter(pl.col("requested_at") <= generated_at)
+        if not len(requests):
+            return 0
+
+        done = (
+            requests
+            .join(report.pending(), on="partnumber", how="left")
+            .with_columns(pl.col("pending_boxes").fill_null(0))
+            .sort(["partnumber", "requested_at"], descending=[False, True])
+            # newest requests are the ones still open in LT22, older ones were picked
+            .with_columns(pl.col("boxes").cum_sum().over("partnumber").alias("_newer_boxes"))
+            .filter(pl.col("_newer_boxes") - pl.col("boxes") >= pl.col("pending_boxes"))
+        )
+        if len(done):
+            self._execute(
+                "UPDATE lm01_requests SET status = 'done' WHERE id = %s",
+                done.select("id").rows(), many=True
+            )
+            # picked boxes arrived at the line, so the ledger balance goes up by them
+            if self.inventory is not None:
+                self.inventory.replenish(done.select("partnumber", pl.col("boxes").alias("qty_boxes")))
+        return len(done)
+
+    def net_shortfall(self, df) -> pl.DataFrame:
+        if isinstance(df, pl.LazyFrame):
+            df = df.collect()
+
+        return (
+            df.join(self.outstanding(), on="partnumber", how="left")
+            .with_columns(
+                (pl.col("qty_boxes_to_request") - pl.col("in_flight_boxes").fill_null(0))
+                .clip(0, None)
+                .alias("qty_boxes_to_request")
+            )
+            .filter(pl.col("qty_boxes_to_request") > 0)
+            .drop("in_flight_boxes")
+        )
@@ -0,0 +1,158 @@
+from datetime import datetime
+from mysql.connector import errors
+from database.queries import SelectInfos
+import polars as pl, time
+
+
+STATE_QUERY = """
+    SELECT pkmc.partnumber, pkmc.num_reg_circ, pk05.takt, pkmc.rack,
+        pkmc.lb_balance, pkmc.total_theoretical_qty, pkmc.qty_for_restock, pkmc.qty_per_box,
+        pkmc.qty_max_box, GREATEST(pkmc.updated_at, pk05.updated_at) AS updated_at
+    FROM pkmc
+    JOIN pk05 ON pk05.supply_area = pkmc.supply_area
+"""
+
+# >= re-reads rows at the watermark itself, rows committed later in the same millisecond are not lost
+DELTA_FILTER = "WHERE pkmc.updated_at >= %s OR pk05.updated_at >= %s"
+
+EPOCH = datetime(1970, 1, 1)
+
+
+class ReplenishmentState(SelectInfos):
+    def __init__(self, full_refresh_interval: float = 900.0):
+        SelectInfos.__init__(self)
+        self.full_refresh_interval = full_refresh_interval
+        self.frame = None
+        self.watermark = EPOCH
+        self.last_full_refresh = 0.0
+
+    def _load(self, query, params=None):
+        # the state lives as long as the worker, so a dropped connection is reopened once
+        try:
+            return self.select_bd_infos(query, params).collect()
+        except (errors.InterfaceError, errors.OperationalError):
+            try:
+                self.connection.close()
+            except Exception:
+                pass
+            self._connection = None
+            return self.select_bd_infos(query, params).collect()
+
+    def refresh(self):
+        if self.frame is None or time.monotonic() - self.last_full_refresh > self.full_refresh_interval:
+            self.frame = self._load(STATE_QUERY).unique(subset="partnumber", keep="last", maintain_order=True)
+            self.last_full_refresh = time.monotonic()
+        else:
+            delta = self._load(STATE_QUERY + DELTA_FILTER, (self.watermark, self.watermark))
+            if len(delta):
+                delta = delta.unique(subset="partnumber", keep="last", maintain_order=True)
+                self.frame = pl.concat([
+                    self.frame.join(delta.select("partnumber"), on="partnumber", how="anti"),
+                    delta.select(self.frame.columns),
+                ], how="vertical_relaxed")
+
+        # an empty table keeps the epoch watermark, so the next delta picks up the first rows
+        if len(self.frame):
+            self.watermark = self.frame["updated_at"].max()
+        return self.frame
+
+    def apply_balances(self, df: pl.DataFrame):
+        if self.frame is None or not len(df):
+            return
+        self.frame = (
+            self.frame
+            .join(df.select(["partnumber", pl.col("lb_balance").alias("_lb_new")]), on="partnumber", how="left")
+            .with_columns(pl.coalesce("_lb_new", "lb_balance").alias("lb_balance"))
+            .drop("_lb_new")
+        )
+
+
+# -- POLICIES - EACH ONE RECEIVES THE WHOLE STATE AND RETURNS IT WITH ITS COLUMNS SET --
+class MinMaxPolicy:
+    def apply(self, df: pl.DataFrame) -> pl.DataFrame:
+        return df.with_columns(
+            pl.col("qty_for_restock").alias("reorder_point"),
+            pl.col("total_theoretical_qty").alias("target_qty"),
+        )
+
+
+class ReorderPointPolicy:
+    def __init__(self, lead_time_takts: int, demand: pl.DataFrame | None = None):
+        self.lead_time_takts = lead_time_takts
+        self.demand = demand
+
+    def apply(self, df: pl.DataFrame) -> pl.DataFrame:
+        if self.demand is None:
+            return df
+
+        lead_time_demand = pl.col("usage_per_takt").fill_null(0) * self.lead_time_takts
+        return (
+            df.join(self.demand.select(["partnumber", "usage_per_takt"]), on="partnumber", how="left")
+            .with_columns(
+                pl.min_horizontal(
+                    pl.col("reorder_point") + lead_time_demand,
+                    pl.col("target_qty"),
+                ).alias("reorder_point")
+            )
+            .drop("usage_per_takt")
+        )
+
+
+class BoxRounding:
+    def __init__(self, mode: str = "floor"):
+        if mode not in ("floor", "ceil"):
+            raise ValueError(f"Modo de arredondamento inválido: {mode}")
+        self.mode = mode
+
+    def apply(self, df: pl.DataFrame) -> pl.DataFrame:
+        boxes = (pl.col("target_qty") - pl.col("lb_balance")) / pl.col("qty_per_box")
+        boxes = boxes.floor() if self.mode == "floor" else boxes.ceil()
+        return df.with_columns(
+            pl.when(pl.col("qty_per_box") > 0)
+                .then(boxes.clip(0, pl.col("qty_max_box")))
+                .otherwise(0)
+                .cast(pl.Int64)
+                .alias("qty_boxes_to_request")
+        )
+
+
+class ReplenishmentPlanner:
+    def __init__(self, state: ReplenishmentState, policies=None, ledger=None):
+        self.state = state
+        self.policies = policies or [MinMaxPolicy(), BoxRounding()]
+        self.ledger = ledger
+        self.last_timing = {}
+
+    def plan(self, refresh: bool = True) -> pl.DataFrame:
+        started = time.perf_counter()
+        if refresh:
+            self.state.refresh()
+        if self.ledger is not None:
+            self.state.apply_balances(self.ledger.snapshot(dirty_only=True))
+        df = self.state.frame
+        refreshed = time.perf_counter()
+
+        for policy in self.policies:
+            df = policy.apply(df)
+
+        plan = (
+            df.filter(
+                (pl.col("lb_balance") <= pl.col("reorder_point")) &
+                (pl.col("qty_boxes_to_request") > 0)
+            )
+            .with_columns(
+                (pl.col("target_qty") - pl.col("lb_balance")).alias("qty_for_request"),
+                pl.lit(datetime.now()).alias("planned_at"),
+            )
+            .sort(["takt", "rack", "partnumber"], nulls_last=True)
+            .with_row_index(name="sequence")
+        )
+
+        finished = time.perf_counter()
+        self.last_timing = {
+            "refresh_ms": (refreshed - started) * 1000,
+            "plan_ms": (finished - refreshed) * 1000,
+            "parts": len(df),
+            "requests": len(plan),
+        }
+        return plan
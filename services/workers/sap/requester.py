@@ -1,42 +1,22 @@
-from database.queries import SelectInfos
+from services.consumption.ledger import LEDGER
+from .planner import ReplenishmentState, ReplenishmentPlanner
 import polars as pl
 
 
-class DefineDataFrame(SelectInfos):
-    def __init__(self):
-        SelectInfos.__init__(self)
-
-    def _return_partnumbers_to_request(self):
-        return self.select_bd_infos(
-                """
-                    SELECT pkmc.partnumber, pkmc.num_reg_circ, pk05.takt, pkmc.rack,
-                        pkmc.lb_balance, pkmc.total_theoretical_qty, pkmc.qty_for_restock, pkmc.qty_per_box,
-                        pkmc.qty_max_box
-                    FROM pkmc
-                    JOIN pk05 ON pk05.supply_area = pkmc.supply_area
-                    WHERE pkmc.lb_balance <= pkmc.qty_for_restock;
-                """
-            )
-
-
 class QuantityToRequest:
-    def _define_diference_to_request(self):
-        df = DefineDataFrame()._return_partnumbers_to_request()
-        df = df.with_columns([
-            (pl.col("total_theoretical_qty") - pl.col("lb_balance"))
-                .alias("qty_for_request"),
+    planner = None
 
-            ((pl.col("total_theoretical_qty") - pl.col("lb_balance")) / pl.col("qty_per_box"))
-                .floor()
-                .alias("qty_boxes_to_request")
-        ])
-        return df
+    def _define_diference_to_request(self):
+        if QuantityToRequest.planner is None:
+            QuantityToRequest.planner = ReplenishmentPlanner(ReplenishmentState(), ledger=LEDGER)
+        return QuantityToRequest.planner.plan().lazy()
 
 
 class LM01_Requester:
-    def __init__(self, sap, df):
+    def __init__(self, sap, df, ledger=None):
         self.sap = sap
-        self.df = df.collect()
+        self.df = df.collect() if isinstance(df, pl.LazyFrame) else df
+        self.ledger = ledger
 
     def _request_lm01(self):
         session, _ = self.sap.run_transaction("/nLM01")
@@ -53,4 +33,7 @@ class LM01_Requester:
                 session.findById("wnd[0]").sendVKey(0)
                 session.findById("wnd[0]").sendVKey(8)
                 session.findById("wnd[0]/usr/btnRLMOB-POK").press()
-                session.findById("wnd[0]/usr/btnBTOK").press()
\ No newline at end of file
+                session.findById("wnd[0]/usr/btnBTOK").press()
+
+            if self.ledger is not None and qtd_caixas > 0:
+                self.ledger.record(row["partnumber"], num_circ, qtd_caixas)
@@ -1,17 +1,25 @@
-from .client import SAP_Launcher, SAP_SessionProvider, SAP_Authenticator, SAP_Client
+from concurrent.futures import wait
+from .client import SAP_Launcher, SAP_SessionProvider, SAP_Authenticator, SAP_Client, SAP_SessionPool
 from .requester import QuantityToRequest, LM01_Requester
 from .reqdone import LT22_Session, LT22_Selectors, LT22_Parameters, LT22_Submit
 from .listreq import SP02_Session, SP02_Rows, SP02_Actions
+from .inflight import LT22_Report, InFlightLedger
+from services.consumption.ledger import LEDGER
+import polars as pl
 
 
-def initialize_sap():
-    launcher = SAP_Launcher()
+def initialize_sap(launcher=None):
+    launcher = launcher or SAP_Launcher()
     provider = SAP_SessionProvider(launcher)
     auth = SAP_Authenticator()
     sap = SAP_Client(provider, auth, launcher)
     return sap
 
 
+def initialize_sap_pool(size=None, launcher=None):
+    return SAP_SessionPool(initialize_sap(launcher), size)
+
+
 def lt22_verify_requests(sap):
     session = LT22_Session(sap).open()
 
@@ -24,15 +32,15 @@ def lt22_verify_requests(sap):
     selectors.expand("         68")
     selectors.select("        108")
     selectors.select("        123")
-    selectors.top("        123")
-    selectors.take()
+    selectors.set_top("        123")
+    selectors.press_take()
 
     params.set_b01()
     params.set_pending_only()
     params.set_dates_today()
     params.set_layout()
 
-    submit.send()
+    submit.submit()
 
 
 def sp02_download_latest_lt22(sap):
@@ -46,14 +54,42 @@ def sp02_download_latest_lt22(sap):
         actions.clean(job["index"])
 
 
-def lm01_request(sap):
-    df = QuantityToRequest()._define_diference_to_request()
-    LM01_Requester(sap, df)._request_lm01()
+def lm01_shortfall():
+    ledger = InFlightLedger(inventory=LEDGER)
+    ledger.reconcile(LT22_Report())
+    return ledger.net_shortfall(QuantityToRequest()._define_diference_to_request())
+
+
+def lm01_shards(df, shards):
+    # a control cycle always lands in the same shard, so two sessions never request the same one
+    if shards <= 1 or not len(df):
+        return [df] if len(df) else []
+    return (
+        df.with_columns((pl.col("num_reg_circ").cast(pl.Utf8).hash() % shards).alias("_shard"))
+        .partition_by("_shard", include_key=False, maintain_order=True)
+    )
+
+
+def lm01_request(sap, df=None):
+    df = lm01_shortfall() if df is None else df
+    LM01_Requester(sap, df, InFlightLedger())._request_lm01()
+
+
+def sap_worker(pool=None):
+    pool = pool or initialize_sap_pool()
 
+    with pool:
+        # slot 0 runs LT22 then SP02, shard i always runs on slot i + 1 (slot 0 too when the pool has one session)
+        shards = lm01_shards(lm01_shortfall(), max(1, pool.size - 1))
+        lm01 = [
+            pool.submit(lambda sap, shard=shard: lm01_request(sap, shard), 1 + i)
+            for i, shard in enumerate(shards)
+        ]
 
-def sap_worker():
-    sap = initialize_sap()
+        # LT22 only lists what is already pending, it does not wait for this cycle's LM01
+        pool.submit(lt22_verify_requests, 0).result()
+        download = pool.submit(sp02_download_latest_lt22, 0)
 
-    lm01_request(sap)
-    lt22_verify_requests(sap)
-    sp02_download_latest_lt22(sap)
\ No newline at end of file
+        wait(lm01 + [download])
+        for future in lm01 + [download]:
+            future.result()
\ No newline at end of file
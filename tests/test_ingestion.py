@@ -0,0 +1,75 @@
+import hashlib
+import threading
+import pytest
+
+pytest.importorskip("polars")
+pytest.importorskip("numpy")
+pytest.importorskip("mysql.connector")
+pytest.importorskip("dotenv")
+
+from orchestrator import watcher
+from orchestrator.ingestion import IngestionQueue
+
+
+class SlowPipeline:
+    def __init__(self, fail=False):
+        self.fail = fail
+        self.runs = 0
+        self.started = threading.Event()
+        self.release = threading.Event()
+        self.done = threading.Event()
+
+    def __call__(self):
+        self.runs += 1
+        self.started.set()
+        self.release.wait(5)
+        self.done.set()
+        if self.fail:
+            raise RuntimeError("pkmc indisponível")
+
+
+def wait_idle(queue):
+    # the worker clears the in-flight signature after the pipeline returns
+    for _ in range(500):
+        with queue.lock:
+            if not queue.running and not queue.pending:
+                return
+        threading.Event().wait(0.01)
+    raise AssertionError("ingestion queue did not go idle")
+
+
+def test_upload_then_watcher_runs_the_pipeline_once(tmp_path, monkeypatch):
+    source = tmp_path / "pkmc.xlsx"
+    source.write_bytes(b"pkmc export")
+    pipeline = SlowPipeline()
+    queue = IngestionQueue(pipelines={"pkmc": pipeline})
+    monkeypatch.setattr(watcher, "pipeline_sources", lambda: {"pkmc": source})
+    source_watcher = watcher.SourceWatcher(debounce=0, queue=queue)
+
+    # the upload enqueues with the sha256 of what it wrote
+    assert queue.enqueue("pkmc", hashlib.sha256(source.read_bytes()).hexdigest())["status"] == "service pkmc queued"
+    assert pipeline.started.wait(5)
+
+    # the watcher sees the same write once its debounce expires, while the run is still going
+    source_watcher._mark(source)
+    source_watcher._settle()
+    pipeline.release.set()
+    wait_idle(queue)
+
+    assert pipeline.runs == 1
+    assert queue.last_results["pkmc"] == "success"
+
+
+def test_failed_run_can_be_retried():
+    pipeline = SlowPipeline(fail=True)
+    pipeline.release.set()
+    queue = IngestionQueue(pipelines={"pkmc": pipeline})
+
+    queue.enqueue("pkmc", "abc")
+    assert pipeline.done.wait(5)
+    wait_idle(queue)
+    assert queue.last_results["pkmc"].startswith("failed")
+
+    assert queue.enqueue("pkmc", "abc")["status"] == "service pkmc queued"
+    wait_idle(queue)
+    assert pipeline.runs == 2
@@ -0,0 +1,57 @@
+import pytest
+
+pl = pytest.importorskip("polars")
+pytest.importorskip("numpy")
+pytest.importorskip("mysql.connector")
+pytest.importorskip("dotenv")
+
+from helpers.data.registry import SchemaRegistry
+from services.consumption.ledger import InventoryLedger, LEDGER_TYPES
+
+
+def pkmc(rows):
+    return pl.DataFrame(rows, schema={"partnumber": pl.Utf8, **LEDGER_TYPES})
+
+
+def test_recover_on_empty_ledger(monkeypatch):
+    ledger = InventoryLedger()
+    monkeypatch.setattr(ledger, "_load", lambda partnumbers=None: pkmc({
+        "partnumber": ["5G001", "5G002"],
+        "lb_balance": [10.0, 20.0],
+        "qty_per_box": [5.0, 5.0],
+        "qty_for_restock": [0.0, 0.0],
+        "total_theoretical_qty": [0.0, 0.0],
+    }))
+
+    assert ledger.recover() == 2
+    assert ledger.balance.tolist() == [10.0, 20.0]
+    assert not ledger.dirty.any()
+
+
+def test_recover_empty_pkmc_on_empty_ledger(monkeypatch):
+    ledger = InventoryLedger()
+    monkeypatch.setattr(ledger, "_load", lambda partnumbers=None: pkmc({}))
+
+    assert ledger.recover() == 0
+
+
+def test_unknown_parts_are_looked_up_once(monkeypatch):
+    ledger = InventoryLedger()
+    lookups = []
+
+    def load(partnumbers=None):
+        lookups.append(partnumbers)
+        return pkmc({})
+
+    monkeypatch.setattr(ledger, "_load", load)
+    ledger.recover()
+    usage = SchemaRegistry.apply(pl.DataFrame({"partnumber": ["5G404"], "qty_usage": [1.0]}))
+
+    assert ledger.consume(usage) == 0
+    assert ledger.consume(usage) == 0
+    assert lookups == [None, ["5G404"]]
+
+    # a reload forgets the misses, the part may exist in pkmc by then
+    ledger.recover()
+    ledger.consume(usage)
+    assert lookups[-1] == ["5G404"]
@@ -0,0 +1,61 @@
+import pytest
+
+pytest.importorskip("polars")
+pytest.importorskip("mysql.connector")
+pytest.importorskip("dotenv")
+
+from mysql.connector import errors
+from database.schema import QueryPlanChecker
+
+
+class FakeCursor:
+    def __init__(self, executed):
+        self.executed = executed
+
+    def execute(self, sql, params=None):
+        self.executed.append((sql, params))
+        if "LIMIT NULL" in sql or ("SUM(" in sql and "GROUP BY" not in sql):
+            raise errors.ProgrammingError("You have an error in your SQL syntax")
+
+    def fetchall(self):
+        return [{"table": "fx4pd", "type": "ref"}]
+
+    def close(self):
+        pass
+
+
+class FakeConnection:
+    def __init__(self):
+        self.executed = []
+
+    def cursor(self, dictionary=False):
+        return FakeCursor(self.executed)
+
+
+def checker(queries):
+    plan_checker = QueryPlanChecker()
+    plan_checker._connection = FakeConnection()
+    plan_checker.collect_queries = lambda: queries
+    return plan_checker
+
+
+def test_built_queries_bind_their_own_params():
+    plan_checker = checker(None)
+    plan_checker.collect_queries = plan_checker.built_queries
+    report = plan_checker.check()
+
+    assert [r["error"] for r in report] == [None, None]
+    for sql, params in plan_checker._connection.executed:
+        assert "NULL" not in sql
+        assert params[-2:] == (1, 0)
+
+
+def test_a_rejected_statement_does_not_hide_the_others():
+    report = checker([
+        ("services/a.py:1", "SELECT partnumber, SUM(qty_usage) FROM forecast", None),
+        ("services/b.py:1", "SELECT partnumber FROM fx4pd WHERE werk = %s", None),
+    ]).check()
+
+    assert "syntax" in report[0]["error"]
+    assert report[1]["error"] is None
+    assert report[1]["full_scans"] == []